@@ -0,0 +1,167 @@
+"""
+Iterative-deepening alpha-beta strategy module
+"""
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Set
+from game import Game
+from search_state import SearchState, search_state
+
+# The score of a won game, less the number of moves it takes to win, so
+# quicker wins score higher; scores above WIN_SCORE - MAX_PLY are proven
+WIN_SCORE = 1000000
+MAX_PLY = 100000
+
+
+class _Timeout(Exception):
+    """
+    Raised inside the search when the deadline has passed
+    """
+
+
+class AlphaBetaStrategy:
+    """
+    A strategy choosing moves by alpha-beta search, deepened one move at a
+    time until a deadline
+
+    Every iteration searches the best moves of the previous one first, so
+    its cut-offs come early. When the deadline passes mid-iteration, the
+    best move found so far is returned: either one the unfinished iteration
+    proved better, or the best of the last finished one. Positions whose
+    outcome is still open at the depth limit, or that repeat a position
+    earlier on the line, score 0. The search walks one SearchState with
+    apply and undo, on int move codes, and keys its tables by
+    SearchState.key.
+
+    seconds - the time each call may take
+    max_depth - the deepest iteration to search, or None for no limit
+    __name__ - the name shown for the strategy, as strategy functions have
+
+    >>> from subtract_square_game import SubtractSquareGame
+    >>> AlphaBetaStrategy(seconds=0.5)(SubtractSquareGame(True, 21))
+    '16'
+    """
+
+    seconds: float
+    max_depth: Optional[int]
+    __name__: str
+    _deadline: float
+    _best_moves: Dict[type, Dict[int, int]]
+    _moves_by_key: Dict[int, int]
+    _cut_off: bool
+
+    def __init__(self, seconds: float = 1.0,
+                 max_depth: Optional[int] = None) -> None:
+        """
+        Initialize a strategy with the given time and depth limits
+        """
+        self.seconds = seconds
+        self.max_depth = max_depth
+        self.__name__ = type(self).__name__
+        self._deadline = 0.0
+        self._best_moves = {}
+        self._moves_by_key = {}
+        self._cut_off = False
+
+    def __call__(self, game: Game) -> Any:
+        """
+        Return the best move for game found before the deadline
+        """
+        self._deadline = perf_counter() + self.seconds
+        search = search_state(game.current_state)
+        self._moves_by_key = self._best_moves.setdefault(type(search), {})
+        root = search.key()
+        moves = search.get_move_codes()
+        best_move = moves[0]
+        depth = 1
+        while self.max_depth is None or depth <= self.max_depth:
+            self._cut_off = False
+            ordered = self._ordered(root, moves)
+            iteration_move = None
+            iteration_score = -WIN_SCORE - 1
+            try:
+                for move in ordered:
+                    score = self._child_score(search, move, depth - 1, 1,
+                                              iteration_score, WIN_SCORE + 1,
+                                              {root})
+                    if score > iteration_score:
+                        iteration_move, iteration_score = move, score
+            except _Timeout:
+                if iteration_move is not None:
+                    best_move = iteration_move
+                break
+
+            best_move = iteration_move
+            self._moves_by_key[root] = best_move
+            if abs(iteration_score) > WIN_SCORE - MAX_PLY or \
+                    not self._cut_off:
+                # the outcome is proven, or the whole tree was searched
+                break
+            depth += 1
+        return game.str_to_move(game.current_state.code_to_move(best_move))
+
+    def _ordered(self, key: int, moves: List[int]) -> List[int]:
+        """
+        Return moves with the best move found for the position with key by
+        an earlier iteration first
+        """
+        best = self._moves_by_key.get(key)
+        if best is None or best not in moves:
+            return moves
+        return [best] + [move for move in moves if move != best]
+
+    def _child_score(self, search: SearchState, move: int, depth: int,
+                     ply: int, alpha: int, beta: int, path: Set[int]) -> int:
+        """
+        Return the score of applying move to search, seen by the player to
+        move before it, searching within the window (alpha, beta) of that
+        player. search is back in its position on return, unless the
+        deadline passed and the whole search is being given up.
+        """
+        is_p1_turn = search.is_p1_turn
+        search.apply(move)
+        if search.is_p1_turn == is_p1_turn:
+            score = self._search(search, depth, ply, alpha, beta, path)
+        else:
+            score = -self._search(search, depth, ply, -beta, -alpha, path)
+        search.undo()
+        return score
+
+    def _search(self, search: SearchState, depth: int, ply: int,
+                alpha: int, beta: int, path: Set[int]) -> int:
+        """
+        Return the score of the position of search for the player to move
+        in it, searched depth more moves deep, ply moves below the root
+        """
+        if perf_counter() >= self._deadline:
+            raise _Timeout()
+        if search.is_over():
+            # the player named by an over state is its winner
+            return WIN_SCORE - ply
+        key = search.key()
+        if key in path:
+            return 0
+        if depth == 0:
+            self._cut_off = True
+            return 0
+
+        path.add(key)
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        try:
+            for move in self._ordered(key, search.get_move_codes()):
+                score = self._child_score(search, move, depth - 1, ply + 1,
+                                          alpha, beta, path)
+                if score > best_score:
+                    best_score, best_move = score, move
+                    alpha = max(alpha, score)
+                    if alpha >= beta:
+                        break
+        finally:
+            path.discard(key)
+        self._moves_by_key[key] = best_move
+        return best_score
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the hot paths of the games, strategies and solvers
+
+Run with python -m benchmarks from the project directory. Results are
+written as JSON, and can be compared against a saved baseline.
+"""
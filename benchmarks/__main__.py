@@ -0,0 +1,173 @@
+"""
+Benchmark runner module
+
+Times move generation, move checking and move application on states of both
+games, full random-vs-random games and solver runs, and writes the results
+as JSON. Given a baseline file, it also prints how each timing changed.
+
+    python -m benchmarks --output bench.json
+    python -m benchmarks --output after.json --baseline bench.json
+"""
+import argparse
+import json
+import platform
+import sys
+from timeit import Timer
+from typing import Callable, Dict, List, Optional
+from chopsticks_current_state import ChopsticksCurrentState
+from chopsticks_game import ChopsticksGame
+from chopsticks_solver import ChopsticksSolver
+from game_runner import play_games
+from strategy import random_strategy
+from subtract_square_current_state import SubtractSquareCurrentState
+from subtract_square_game import SubtractSquareGame
+from subtract_square_solver import (SubtractSquareSolver,
+                                    SubtractSquareBitsetSolver)
+
+SUBTRACT_SQUARE_VALUES = (20, 1000, 1000000)
+SOLVER_LIMITS = (10000, 100000, 1000000)
+GAME_VALUES = (20, 100, 1000)
+GAMES_PER_RUN = 100
+
+
+def _time(func: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Return the best time in seconds of one call of func, over repeat runs
+    of as many calls as take about 0.2 seconds
+    """
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def _state_benchmarks() -> Dict[str, float]:
+    """
+    Return timings of get_possible_moves, is_valid_move and make_move on
+    states of both games, and of their int move code counterparts
+    """
+    results = {}
+    for value in SUBTRACT_SQUARE_VALUES:
+        state = SubtractSquareCurrentState(True, value)
+        name = f'subtract_square[{value}]'
+        results[f'{name}.init'] = _time(
+            lambda: SubtractSquareCurrentState(True, value))
+        results[f'{name}.get_possible_moves'] = _time(
+            lambda: SubtractSquareCurrentState(True, value)
+            .get_possible_moves())
+        results[f'{name}.is_valid_move'] = _time(
+            lambda: state.is_valid_move('4'))
+        results[f'{name}.make_move'] = _time(lambda: state.make_move('4'))
+        results[f'{name}.get_move_codes'] = _time(state.get_move_codes)
+        results[f'{name}.make_move_code'] = _time(
+            lambda: state.make_move_code(4))
+
+    state = ChopsticksCurrentState(True, [2, 3, 4, 1])
+    results['chopsticks.init'] = _time(
+        lambda: ChopsticksCurrentState(True, [2, 3, 4, 1]))
+    results['chopsticks.get_possible_moves'] = _time(
+        state.get_possible_moves)
+    results['chopsticks.is_valid_move'] = _time(
+        lambda: state.is_valid_move('rl'))
+    results['chopsticks.make_move'] = _time(lambda: state.make_move('rl'))
+    results['chopsticks.get_move_codes'] = _time(state.get_move_codes)
+    results['chopsticks.make_move_code'] = _time(
+        lambda: state.make_move_code(2))
+    return results
+
+
+def _game_benchmarks() -> Dict[str, float]:
+    """
+    Return timings of one full random-vs-random game, averaged over
+    GAMES_PER_RUN games
+    """
+    results = {}
+    for value in GAME_VALUES:
+        results[f'random_game.subtract_square[{value}]'] = _time(
+            lambda: list(play_games(GAMES_PER_RUN, SubtractSquareGame,
+                                    random_strategy, random_strategy,
+                                    seed=0, current_value=value)),
+            repeat=3) / GAMES_PER_RUN
+    return results
+
+
+def _solver_benchmarks() -> Dict[str, float]:
+    """
+    Return timings of solving each game from scratch
+    """
+    results = {}
+    for limit in SOLVER_LIMITS:
+        results[f'solver.subtract_square[{limit}]'] = _time(
+            lambda: SubtractSquareSolver(limit), repeat=1)
+        results[f'solver.subtract_square_bitset[{limit}]'] = _time(
+            lambda: SubtractSquareBitsetSolver(limit), repeat=1)
+    results['solver.chopsticks'] = _time(ChopsticksSolver, repeat=3)
+    return results
+
+
+def run(groups: List[str]) -> Dict[str, object]:
+    """
+    Return the timings of the benchmark groups named in groups, with a
+    description of the machine they ran on
+    """
+    benchmarks = {'states': _state_benchmarks,
+                  'games': _game_benchmarks,
+                  'solvers': _solver_benchmarks}
+    timings = {}
+    for group in groups:
+        timings.update(benchmarks[group]())
+    return {'python': sys.version.split()[0],
+            'machine': platform.platform(),
+            'timings': timings}
+
+
+def compare(results: Dict[str, object],
+            baseline: Dict[str, object]) -> List[str]:
+    """
+    Return lines describing how each timing in results changed from
+    baseline
+
+    >>> compare({'timings': {'a': 1.0, 'b': 3.0}},
+    ...         {'timings': {'a': 2.0}})
+    ['a: 2.000e+00s -> 1.000e+00s (2.00x faster)', 'b: 3.000e+00s (new)']
+    """
+    lines = []
+    old_timings = baseline['timings']
+    for name, new in results['timings'].items():
+        old = old_timings.get(name)
+        if old is None:
+            lines.append(f'{name}: {new:.3e}s (new)')
+        elif new <= old:
+            lines.append(f'{name}: {old:.3e}s -> {new:.3e}s '
+                         f'({old / new:.2f}x faster)')
+        else:
+            lines.append(f'{name}: {old:.3e}s -> {new:.3e}s '
+                         f'({new / old:.2f}x slower)')
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Run the benchmarks chosen on the command line argv
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--output', default='bench_output.json',
+                        help='file to write the results to')
+    parser.add_argument('--baseline',
+                        help='results file to compare against')
+    parser.add_argument('--only', action='append',
+                        choices=['states', 'games', 'solvers'],
+                        help='benchmark group to run (default: all)')
+    args = parser.parse_args(argv)
+
+    results = run(args.only or ['states', 'games', 'solvers'])
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            for line in compare(results, json.load(baseline)):
+                print(line)
+
+
+if __name__ == '__main__':
+    main()
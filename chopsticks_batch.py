@@ -0,0 +1,123 @@
+"""
+Chopsticks batch rollout module
+
+Plays many random-vs-random Chopsticks games at once as NumPy arrays, for
+large-scale random playouts.
+"""
+from typing import Any, NamedTuple, Optional
+import numpy as np
+
+# For each move in ll, lr, rl, rr, the columns of the (N, 4) hand array
+# holding the hand the current player touches with and the opponent's
+# hand it touches, on Player 1's turn and on Player 2's turn
+_P1_ATTACKERS = np.array([0, 0, 1, 1])
+_P1_TOUCHED = np.array([2, 3, 2, 3])
+_P2_ATTACKERS = np.array([2, 2, 3, 3])
+_P2_TOUCHED = np.array([0, 1, 0, 1])
+
+
+class ChopsticksBatchResult(NamedTuple):
+    """
+    The outcomes of a batch of games
+
+    p1_wins - for each game, True if Player 1 won it
+    draws - for each game, True if it hit the move cap unfinished
+    move_counts - for each game, the number of moves made
+    """
+
+    p1_wins: np.ndarray
+    draws: np.ndarray
+    move_counts: np.ndarray
+
+
+def legal_moves(hands: np.ndarray, p1_turn: np.ndarray) -> np.ndarray:
+    """
+    Return an (N, 4) mask of the moves ll, lr, rl, rr the current player
+    can make in each of the N positions with the given hands and turns:
+    the touching and the touched hand must both be alive
+
+    >>> legal_moves(np.array([[1, 1, 1, 1], [0, 1, 2, 4]], dtype=np.uint8),
+    ...             np.array([True, True]))
+    array([[ True,  True,  True,  True],
+           [False, False,  True,  True]])
+    """
+    attackers = np.where(p1_turn[:, None], _P1_ATTACKERS, _P2_ATTACKERS)
+    touched = np.where(p1_turn[:, None], _P1_TOUCHED, _P2_TOUCHED)
+    return ((np.take_along_axis(hands, attackers, 1) != 0) &
+            (np.take_along_axis(hands, touched, 1) != 0))
+
+
+def random_rollouts(games: int, hands: Any = (1, 1, 1, 1),
+                    is_p1_turn: Any = True, max_moves: int = 200,
+                    seed: Optional[int] = None) -> ChopsticksBatchResult:
+    """
+    Return the results of games random-vs-random games started from hands
+    (one row for all games, or an (N, 4) array) with is_p1_turn saying who
+    moves first. A game still going after max_moves moves is a draw, since
+    random play can cycle forever.
+
+    Every round, each game still going picks one of its legal moves
+    uniformly and adds the touching hand to the touched one. The rules of
+    ChopsticksCurrentState._value_correction (a hand of exactly 5 dies, a
+    hand over 5 wraps around) come to the sum modulo 5, since a sum is at
+    most 8. A game whose player loses both hands is won by the player who
+    made that move.
+
+    >>> result = random_rollouts(2, [[0, 1, 0, 4], [0, 4, 0, 1]],
+    ...                          [True, False], seed=0)
+    >>> result.p1_wins
+    array([ True, False])
+    >>> result.move_counts
+    array([1, 1])
+    >>> result = random_rollouts(10000, seed=0)
+    >>> bool(0.4 < result.p1_wins.mean() < 0.55)
+    True
+    >>> bool(0.1 < result.draws.mean() < 0.2)
+    True
+    """
+    hands = np.array(np.broadcast_to(np.asarray(hands, dtype=np.uint8),
+                                     (games, 4)))
+    p1_turn = np.array(np.broadcast_to(np.asarray(is_p1_turn, dtype=bool),
+                                       (games,)))
+    move_counts = np.zeros(games, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+
+    p1_dead = (hands[:, 0] == 0) & (hands[:, 1] == 0)
+    p2_dead = (hands[:, 2] == 0) & (hands[:, 3] == 0)
+    # the player named by an over game is its winner
+    p1_wins = np.where(p1_dead | p2_dead, p1_turn, False)
+    playing = np.flatnonzero(~(p1_dead | p2_dead))
+    for _ in range(max_moves):
+        if not playing.size:
+            break
+        current = hands[playing]
+        turn = p1_turn[playing]
+        legal = legal_moves(current, turn)
+
+        # pick the r-th legal move, for r uniform below the legal count
+        counts = legal.sum(axis=1)
+        picks = (rng.random(playing.size) * counts).astype(np.int64)
+        moves = (np.cumsum(legal, axis=1) > picks[:, None]).argmax(axis=1)
+
+        rows = np.arange(playing.size)
+        attackers = np.where(turn, _P1_ATTACKERS[moves], _P2_ATTACKERS[moves])
+        touched = np.where(turn, _P1_TOUCHED[moves], _P2_TOUCHED[moves])
+        current[rows, touched] = ((current[rows, touched] +
+                                   current[rows, attackers]) % 5)
+        hands[playing] = current
+        move_counts[playing] += 1
+
+        touched_dead = np.where(turn, current[:, 2] | current[:, 3],
+                                current[:, 0] | current[:, 1]) == 0
+        p1_wins[playing[touched_dead]] = turn[touched_dead]
+        playing = playing[~touched_dead]
+        p1_turn[playing] = ~p1_turn[playing]
+
+    draws = np.zeros(games, dtype=bool)
+    draws[playing] = True
+    return ChopsticksBatchResult(p1_wins, draws, move_counts)
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
@@ -1,9 +1,55 @@
 """
 Chopsticks current state module
 """
-from typing import List, Any
+from random import Random
+from typing import FrozenSet, List, Any, Optional, Tuple
 from current_state import CurrentState
 
+# The moves in the order ll, lr, rl, rr used to index successors: the first
+# letter is the current player's hand, the second the opponent's
+_MOVES = ('ll', 'lr', 'rl', 'rr')
+_MOVE_INDEXES = {move: index for index, move in enumerate(_MOVES)}
+
+# A position is packed into one int: its hand values as base-5 digits,
+# Player 1's left hand first, times two, plus one if it is Player 1's turn
+_POSITIONS = 5 ** 4 * 2
+
+# Tables filled in by _build_tables, indexed by packed position: its hand
+# values, its possible moves as letters, as move indexes and as a set of
+# both for is_valid_move, and, at position * 4 + move index, the position
+# that move leads to (or -1 if it is impossible)
+_HANDS: List[Tuple[int, ...]] = []
+_POSSIBLE_MOVES: List[Tuple[str, ...]] = []
+_MOVE_CODES: List[Tuple[int, ...]] = []
+_MOVE_SETS: List[FrozenSet[Any]] = []
+_TRANSITIONS: List[int] = []
+
+# The canonical state of each packed position, made on first use. There are
+# only _POSITIONS of them, so they are all kept.
+_STATES: List[Optional['ChopsticksCurrentState']] = [None] * _POSITIONS
+
+
+def _pack(is_p1_turn: bool, hands: Any) -> int:
+    """
+    Return the packed position with the given turn and hand values
+
+    >>> _pack(True, [1, 1, 1, 1])
+    313
+    >>> _HANDS[_pack(False, [0, 4, 1, 0])]
+    (0, 4, 1, 0)
+    >>> _pack(True, [0, 5, 1, 1])
+    Traceback (most recent call last):
+    ...
+    ValueError: [0, 5, 1, 1] is not four hand values from 0 to 4
+    """
+    if len(hands) != 4 or not all(isinstance(hand, int) and 0 <= hand <= 4
+                                  for hand in hands):
+        raise ValueError(f'{hands!r} is not four hand values from 0 to 4')
+    code = 0
+    for hand in hands:
+        code = code * 5 + hand
+    return code * 2 + (1 if is_p1_turn else 0)
+
 
 class ChopsticksCurrentState(CurrentState):
     """
@@ -11,7 +57,8 @@ class ChopsticksCurrentState(CurrentState):
 
     current_value - the current value for the state of the game
 
-    moves - possible moves based on the state of the game
+    moves - possible moves based on the state of the game, derived from
+    current_value
 
     >>> ChopsticksCurrentState(True).get_possible_moves()
     ['ll', 'lr', 'rl', 'rr']
@@ -23,32 +70,86 @@ class ChopsticksCurrentState(CurrentState):
     False
     """
 
-    current_value: List[int]
-    moves: List[int]
+    __slots__ = ('_code',)
+
+    _code: int
 
     def __init__(self, is_p1_turn: bool, value=None) -> None:
         """
-        This initialize method extends the current_state initializer
+        This initialize method extends the current_state initializer.
+        The position is kept packed into one int, and current_value and
+        moves are derived from it when asked for. A ValueError is raised
+        unless value is four hand values from 0 to 4.
+        """
+        CurrentState.__init__(self, is_p1_turn)
+        if value is None:
+            value = (1, 1, 1, 1)
+        object.__setattr__(self, '_code', _pack(is_p1_turn, value))
+
+    @staticmethod
+    def intern(is_p1_turn: bool, value=None) -> 'ChopsticksCurrentState':
         """
-        self.current_value = []
+        Return the canonical state with the given turn and hand values,
+        shared with every other caller asking for it
 
+        >>> state = ChopsticksCurrentState.intern(False, [1, 1, 2, 1])
+        >>> state is ChopsticksCurrentState(True).make_move('ll')
+        True
+        """
         if value is None:
-            CurrentState.__init__(self, is_p1_turn)
-            self.current_value = [1, 1, 1, 1]
-        else:
-            CurrentState.__init__(self, is_p1_turn)
-            self.current_value = value
+            value = (1, 1, 1, 1)
+        return ChopsticksCurrentState._from_code(_pack(is_p1_turn, value))
 
-        self.moves = [[], [], [], []]
+    def __reduce__(self) -> Tuple[Any, Tuple[bool, List[int]]]:
+        """
+        Return how to rebuild self, as the canonical state with its turn
+        and hand values, so states can be copied and pickled despite
+        refusing __setattr__
 
-        # Only populate moves if game isn't over
-        if self.current_value[:2] != [0, 0] and \
-                (self.current_value[1:] != [0, 0]):
-            if self.get_current_player_name() == "p1":
-                self._add_p1_moves()
+        >>> import pickle
+        >>> state = ChopsticksCurrentState(False, [0, 4, 1, 0])
+        >>> pickle.loads(pickle.dumps(state)) == state
+        True
+        """
+        return (ChopsticksCurrentState.intern,
+                (self.is_p1_turn, list(_HANDS[self._code])))
 
-            else:
-                self._add_p2_moves()
+    @staticmethod
+    def _from_code(code: int) -> 'ChopsticksCurrentState':
+        """
+        Return the canonical state for the packed position code
+        """
+        state = _STATES[code]
+        if state is None:
+            state = object.__new__(ChopsticksCurrentState)
+            object.__setattr__(state, 'is_p1_turn', code & 1 == 1)
+            object.__setattr__(state, '_code', code)
+            _STATES[code] = state
+        return state
+
+    @property
+    def current_value(self) -> List[int]:
+        """
+        Return the hand values, Player 1's left and right followed by
+        Player 2's left and right
+
+        >>> ChopsticksCurrentState(False, [0, 4, 1, 0]).current_value
+        [0, 4, 1, 0]
+        """
+        return list(_HANDS[self._code])
+
+    @property
+    def moves(self) -> List[List[int]]:
+        """
+        Return the hand values each move leads to, in the order
+        ll, lr, rl, rr, with an empty list for each impossible move
+
+        >>> ChopsticksCurrentState(True, [0, 1, 2, 4]).moves
+        [[], [], [0, 1, 3, 4], [0, 1, 2, 0]]
+        """
+        start = self._code * 4
+        return [list(_HANDS[code]) if code >= 0 else []
+                for code in _TRANSITIONS[start:start + 4]]
 
     def __str__(self) -> str:
         """
@@ -63,21 +164,46 @@ class ChopsticksCurrentState(CurrentState):
         >>> print(ChopsticksCurrentState(False,[0, 4, 1, 0]))
         The state is now: Player 1: 0-4; Player 2: 1-0
         """
-        state = self.current_value
+        state = _HANDS[self._code]
         return f'The state is now: Player 1: {state[0]}-{state[1]}; ' \
                f'Player 2: {state[2]}-{state[3]}'
 
-    def _value_correction(self, move: List[int]) -> List[int]:
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return true if self and other have the same turn and hand values
+
+        >>> state = ChopsticksCurrentState(True)
+        >>> state == ChopsticksCurrentState(True, [1, 1, 1, 1])
+        True
+
+        >>> ChopsticksCurrentState(True) == ChopsticksCurrentState(False)
+        False
+        """
+        return self is other or (type(other) is ChopsticksCurrentState and
+                                 self._code == other._code)
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of self consistent with __eq__
+
+        >>> state = ChopsticksCurrentState(True)
+        >>> hash(state) == hash(ChopsticksCurrentState(True, [1, 1, 1, 1]))
+        True
+        """
+        return hash(self._code)
+
+    @staticmethod
+    def _value_correction(move: List[int]) -> List[int]:
         """
         Correct the values of the possible move states at initialization
 
-        >>> ChopsticksCurrentState._value_correction(ChopsticksCurrentState(True), [1, 3, 2, 6])
+        >>> ChopsticksCurrentState._value_correction([1, 3, 2, 6])
         [1, 3, 2, 1]
 
-        >>> ChopsticksCurrentState._value_correction(ChopsticksCurrentState(True), [5, 3, 3, 1])
+        >>> ChopsticksCurrentState._value_correction([5, 3, 3, 1])
         [0, 3, 3, 1]
 
-        >>> ChopsticksCurrentState._value_correction(ChopsticksCurrentState(True), [6, 3, 5, 4])
+        >>> ChopsticksCurrentState._value_correction([6, 3, 5, 4])
         [1, 3, 0, 4]
         """
         attempted_move = []
@@ -91,72 +217,6 @@ class ChopsticksCurrentState(CurrentState):
                 attempted_move.append(number)
         return attempted_move
 
-    def _add_p1_moves(self) -> None:
-        """
-        Help method that populate moves for p1
-        based on the current state of the game
-        """
-        if self.current_value[0] != 0 and self.current_value[2] != 0:
-            # add p1 left to p2 left if p1L not dead and p2L not dead
-            possible_state = self.current_value[:]
-            possible_state[2] += possible_state[0]
-            possible_state = self._value_correction(possible_state)
-            self.moves[0] = possible_state
-
-        if self.current_value[0] != 0 and self.current_value[3] != 0:
-            # add p1 left to p2 right if p1L not dead and p2R not dead
-            possible_state = self.current_value[:]
-            possible_state[3] += possible_state[0]
-            possible_state = self._value_correction(possible_state)
-            self.moves[1] = possible_state
-
-        # add p1 right to player 2 left if p1R and P2L not dead
-        if self.current_value[1] != 0 and self.current_value[2] != 0:
-            possible_state = self.current_value[:]
-            possible_state[2] += possible_state[1]
-            possible_state = self._value_correction(possible_state)
-            self.moves[2] = possible_state
-
-        # add p1 right to p2 right if p1R and p2R not dead
-        if self.current_value[1] != 0 and self.current_value[3] != 0:
-            possible_state = self.current_value[:]
-            possible_state[3] += possible_state[1]
-            possible_state = self._value_correction(possible_state)
-            self.moves[3] = possible_state
-
-    def _add_p2_moves(self) -> None:
-        """
-        Helper method that populate moves for p2
-        based on the current state of the game
-        """
-        # add p2 left to p1 left if p2L and p1L not dead
-        if self.current_value[2] != 0 and self.current_value[0] != 0:
-            possible_state = self.current_value[:]
-            possible_state[0] += possible_state[2]
-            possible_state = self._value_correction(possible_state)
-            self.moves[0] = possible_state
-
-        # add p2 left to p1 right if p2L and p2R not dead
-        if self.current_value[2] != 0 and self.current_value[1] != 0:
-            possible_state = self.current_value[:]
-            possible_state[1] += possible_state[2]
-            possible_state = self._value_correction(possible_state)
-            self.moves[1] = possible_state
-
-        # add p2 right to p1 left if p2R and p1L not dead
-        if self.current_value[3] != 0 and self.current_value[0] != 0:
-            possible_state = self.current_value[:]
-            possible_state[0] += possible_state[3]
-            possible_state = self._value_correction(possible_state)
-            self.moves[2] = possible_state
-
-        # add p2 right  to p1 right if p2R and p1R not dead
-        if self.current_value[3] != 0 and self.current_value[1] != 0:
-            possible_state = self.current_value[:]
-            possible_state[1] += possible_state[3]
-            possible_state = self._value_correction(possible_state)
-            self.moves[3] = possible_state
-
     def get_possible_moves(self) -> List[str]:
         """Return a list of possible moves (as letters)
         based on the current state of the game
@@ -173,86 +233,94 @@ class ChopsticksCurrentState(CurrentState):
         >>> ChopsticksCurrentState(False,[0, 0, 2, 0]).get_possible_moves()
         []
         """
-        moves = []
+        return list(_POSSIBLE_MOVES[self._code])
 
-        if self.moves[0] != []:
-            moves.append("ll")
-        if self.moves[1] != []:
-            moves.append("lr")
-        if self.moves[2] != []:
-            moves.append("rl")
-        if self.moves[3] != []:
-            moves.append("rr")
+    def is_over(self) -> bool:
+        """
+        Return True if no move can be made from self, because one player's
+        hands are both dead
 
-        return moves
+        >>> ChopsticksCurrentState(False, [0, 0, 2, 0]).is_over()
+        True
+        >>> ChopsticksCurrentState(True).is_over()
+        False
+        """
+        return not _POSSIBLE_MOVES[self._code]
 
-    def make_move(self, move_to_make: str) -> CurrentState:
+    def make_move(self, move_to_make: Any) -> CurrentState:
         """Apply the selected move and return
         a new CurrentState object including
         changing is_p1_turn and a new current_value (which will re populate the
         list of moves
 
-        Because this requires input, examples not available.
-        Please unit test this.
-        """
-        # Turn the input letters into one of the available moves
-        move_state = []
-        if self.get_current_player_name() == "p1":
-            if move_to_make[0] == "l":
-                if move_to_make[1] == "l" and self.moves[0] != []:
-                    # find the move where player 1 adds their
-                    # left hand value to player 2 left hand value
-                    move_state = self.moves[0]
-                elif move_to_make[1] == "r" and self.moves[1] != []:
-                    # find the move where player 1 adds their
-                    # left hand value to player 2 right hand value
-                    move_state = self.moves[1]
-            elif move_to_make[0] == "r":
-                if move_to_make[1] == "l" and self.moves[2] != []:
-                    # find the move where player 1 adds their
-                    # right hand value to player 2 left hand value
-                    move_state = self.moves[2]
-                elif move_to_make[1] == "r" and self.moves[3] != []:
-                    # find the move where player 1 adds their
-                    # right hand value to player 2 right hand value
-                    move_state = self.moves[3]
-
-        elif self.get_current_player_name() == "p2":
-            if move_to_make[0] == "l":
-                if move_to_make[1] == "l" and self.moves[0] != []:
-                    # find the move where player 2 adds their
-                    # left hand value to player 1 left hand value
-                    move_state = self.moves[0]
-                elif move_to_make[1] == "r" and self.moves[1] != []:
-                    # find the move where player 2 adds their
-                    # left hand value to player 1 left hand value
-                    move_state = self.moves[1]
-            elif move_to_make[0] == "r":
-                if move_to_make[1] == "l" and self.moves[2] != []:
-                    # find the move where player 2 adds their
-                    # left hand value to player 1 left hand value
-                    move_state = self.moves[2]
-                elif move_to_make[1] == "r" and self.moves[3] != []:
-                    # find the move where player 2 adds their
-                    # left hand value to player 1 left hand value
-                    move_state = self.moves[3]
-
-        # Once the string is turned into a move,
-        # see if the game is over and return
-        # the appropriate state
-        if move_state[0] == 0 and move_state[1] == 0:
-            switch_state = ChopsticksCurrentState(False, move_state)
-            return switch_state
-        elif move_state[2] == 0 and move_state[3] == 0:
-            switch_state = ChopsticksCurrentState(True, move_state)
-            return switch_state
-        elif self.get_current_player_name() == "p1":
-            switch_state = ChopsticksCurrentState(False, move_state)
-            return switch_state
-        # if game not over and p2 made the last move
-        # switch to p1
-        switch_state = ChopsticksCurrentState(True, move_state)
-        return switch_state
+        The move may be given as letters or as its int code.
+
+        >>> ChopsticksCurrentState(True).make_move(1).current_value
+        [1, 1, 1, 2]
+        """
+        if isinstance(move_to_make, int):
+            return self.make_move_code(move_to_make)
+        if move_to_make not in _MOVE_INDEXES:
+            raise ValueError(f'{move_to_make!r} is not a possible move')
+        return self.make_move_code(_MOVE_INDEXES[move_to_make])
+
+    def get_move_codes(self) -> List[int]:
+        """
+        Return the possible moves as their indexes in ll, lr, rl, rr
+
+        >>> ChopsticksCurrentState(True, [0, 1, 2, 4]).get_move_codes()
+        [2, 3]
+        """
+        return list(_MOVE_CODES[self._code])
+
+    def make_move_code(self, code: int) -> CurrentState:
+        """
+        Return the state the move with index code in ll, lr, rl, rr leads
+        to, looked up in the transition table
+
+        >>> ChopsticksCurrentState(True, [0, 1, 2, 4]).make_move_code(0)
+        Traceback (most recent call last):
+        ...
+        ValueError: 'll' is not a possible move
+        """
+        next_code = -1
+        if 0 <= code < 4:
+            next_code = _TRANSITIONS[self._code * 4 + code]
+        if next_code < 0:
+            raise ValueError(f'{self.code_to_move(code)!r} is not a '
+                             f'possible move')
+        return ChopsticksCurrentState._from_code(next_code)
+
+    def sample_move_code(self, rng: Random) -> int:
+        """
+        Return the index of a possible move picked uniformly at random with
+        rng, straight from the position's table of move indexes
+
+        >>> ChopsticksCurrentState(True, [0, 1, 0, 2]).sample_move(Random(0))
+        'rr'
+        """
+        return rng.choice(_MOVE_CODES[self._code])
+
+    def move_to_code(self, move: Any) -> int:
+        """
+        Return the index of move in ll, lr, rl, rr
+
+        >>> ChopsticksCurrentState(True).move_to_code('rl')
+        2
+        """
+        return _MOVE_INDEXES[move]
+
+    def code_to_move(self, code: int) -> Any:
+        """
+        Return the letters of the move with index code, or code itself if
+        it is not a move index
+
+        >>> ChopsticksCurrentState(True).code_to_move(2)
+        'rl'
+        """
+        if 0 <= code < 4:
+            return _MOVES[code]
+        return code
 
     def is_valid_move(self, move: Any) -> bool:
         """
@@ -266,9 +334,75 @@ class ChopsticksCurrentState(CurrentState):
 
         >>> ChopsticksCurrentState(True, [0, 1, 1, 0]).is_valid_move("rl")
         True
+
+        >>> ChopsticksCurrentState(True, [0, 1, 1, 0]).is_valid_move(2)
+        True
+
+        >>> ChopsticksCurrentState(True).is_valid_move(['ll'])
+        False
+
+        >>> ChopsticksCurrentState(True).is_valid_move(True)
+        False
         """
-        return move in self.get_possible_moves()
+        # True and False equal the move codes 1 and 0, but are no moves
+        if isinstance(move, bool):
+            return False
+        try:
+            return move in _MOVE_SETS[self._code]
+        except TypeError:
+            # an unhashable move cannot be in the set of possible moves
+            return False
 
     if __name__ == "__main__":
         import python_ta
         python_ta.check_all(config="a1_pyta.txt")
+
+
+def _build_tables() -> None:
+    """
+    Fill in _HANDS, _POSSIBLE_MOVES and _TRANSITIONS for every packed
+    position, by the rules of the game
+    """
+    for code in range(_POSITIONS):
+        hands_code = code >> 1
+        hands = (hands_code // 125, hands_code // 25 % 5,
+                 hands_code // 5 % 5, hands_code % 5)
+        is_p1_turn = code & 1 == 1
+        _HANDS.append(hands)
+        game_over = (hands[0] == 0 and hands[1] == 0 or
+                     hands[2] == 0 and hands[3] == 0)
+
+        possible_moves = []
+        move_codes = []
+        for index, move in enumerate(_MOVES):
+            # the current player's hand touches one of the opponent's
+            if is_p1_turn:
+                attacker, touched = index // 2, 2 + index % 2
+            else:
+                attacker, touched = 2 + index // 2, index % 2
+            if game_over or hands[attacker] == 0 or hands[touched] == 0:
+                _TRANSITIONS.append(-1)
+                continue
+
+            move_state = list(hands)
+            move_state[touched] += move_state[attacker]
+            move_state = ChopsticksCurrentState._value_correction(move_state)
+            # once a player's hands are both dead the game is over and the
+            # turn stays with the winner, otherwise it switches
+            if move_state[0] == 0 and move_state[1] == 0:
+                next_turn = False
+            elif move_state[2] == 0 and move_state[3] == 0:
+                next_turn = True
+            else:
+                next_turn = not is_p1_turn
+            _TRANSITIONS.append(_pack(next_turn, move_state))
+            possible_moves.append(move)
+            move_codes.append(index)
+        _POSSIBLE_MOVES.append(tuple(possible_moves))
+        _MOVE_CODES.append(tuple(move_codes))
+        _MOVE_SETS.append(frozenset(possible_moves + move_codes))
+
+
+_build_tables()
+
+
@@ -21,7 +21,7 @@ class ChopsticksGame(Game):
         This initializer extends the initilizer of the Game class
         """
         Game.__init__(self, is_p1_turn)
-        self.current_state = ChopsticksCurrentState(is_p1_turn)
+        self.current_state = ChopsticksCurrentState.intern(is_p1_turn)
 
     def __str__(self) -> str:
         """
@@ -58,7 +58,8 @@ class ChopsticksGame(Game):
     def is_winner(self, player: str) -> bool:
         #  check to see if the game is over and if there are any moves available
         """
-        Return True if the game is over and player is the winner
+        Return True if the game is over and player is the winner, or if
+        player is "draw" and the game is drawn
 
         >>> ChopsticksGame(True).is_winner("p1")
         False
@@ -66,6 +67,8 @@ class ChopsticksGame(Game):
         >>> ChopsticksGame(False).is_winner("P2   ")
         False
         """
+        if player.strip().lower() == "draw":
+            return self.is_draw()
         if self.is_over(self.current_state):
             return self.current_state.get_current_player_name() == (
                 player.strip().lower())
@@ -97,13 +100,7 @@ class ChopsticksGame(Game):
         >>> ChopsticksGame(True).is_over(ChopsticksGame(True).current_state)
         False
         """
-        state_list = current_state.current_value
-        if state_list[0] == 0 and state_list[1] == 0:
-            return True
-        elif state_list[2] == 0 and state_list[3] == 0:
-            return True
-
-        return False
+        return current_state.is_over()
 
     if __name__ == "__main__":
         import python_ta
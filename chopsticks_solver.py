@@ -0,0 +1,128 @@
+"""
+Chopsticks solver module
+"""
+from collections import deque
+from itertools import product
+from typing import Dict
+from chopsticks_game import ChopsticksGame
+from chopsticks_current_state import ChopsticksCurrentState
+
+WIN = 'win'
+LOSS = 'loss'
+DRAW = 'draw'
+
+_FLIPPED = {WIN: LOSS, LOSS: WIN, DRAW: DRAW}
+
+
+class ChopsticksSolver:
+    """
+    Outcome and best move of every Chopsticks position, found by
+    retrograde analysis
+
+    The outcome of a position is seen from the point of view of the player
+    whose turn it is there: WIN or LOSS with perfect play by both players,
+    or DRAW if neither player can avoid the game cycling forever.
+
+    >>> solver = ChopsticksSolver()
+    >>> solver.outcome(ChopsticksCurrentState(True))
+    'draw'
+    >>> solver.outcome(ChopsticksCurrentState(True, [1, 4, 0, 1]))
+    'win'
+    >>> solver.best_move(ChopsticksCurrentState(True, [1, 4, 0, 1]))
+    'rr'
+    >>> solver.outcome(ChopsticksCurrentState(False, [1, 4, 0, 1]))
+    'loss'
+    """
+
+    _outcomes: Dict[ChopsticksCurrentState, str]
+    _best_moves: Dict[ChopsticksCurrentState, str]
+
+    def __init__(self) -> None:
+        """
+        Solve every combination of hand values and turn
+        """
+        self._outcomes = {}
+        self._best_moves = {}
+        game = ChopsticksGame(True)
+
+        # every move, as (parent, move, whether the same player moves
+        # next), leading to each position
+        parents = {}
+        unresolved_moves = {}
+        resolved = deque()
+        for is_p1_turn, hands in product((True, False),
+                                         product(range(5), repeat=4)):
+            if hands[:2] == (0, 0) and hands[2:] == (0, 0):
+                continue
+            state = ChopsticksCurrentState(is_p1_turn, list(hands))
+            parents.setdefault(state, [])
+            if game.is_over(state):
+                # the player named by an over state is its winner
+                self._outcomes[state] = WIN
+                resolved.append(state)
+                continue
+
+            moves = state.get_possible_moves()
+            unresolved_moves[state] = len(moves)
+            for move in moves:
+                child = state.make_move(move)
+                parents.setdefault(child, []).append(
+                    (state, move, child.is_p1_turn == is_p1_turn))
+
+        # work backwards from the over positions: a position is won as soon
+        # as one move reaches a position lost for the opponent, and lost once
+        # every move reaches a position won for the opponent
+        while resolved:
+            state = resolved.popleft()
+            outcome = self._outcomes[state]
+            for parent, move, same_player in parents[state]:
+                if parent in self._outcomes:
+                    continue
+                parent_outcome = outcome if same_player else _FLIPPED[outcome]
+                if parent_outcome == WIN:
+                    self._resolve(parent, WIN, move, resolved)
+                else:
+                    unresolved_moves[parent] -= 1
+                    if unresolved_moves[parent] == 0:
+                        self._resolve(parent, LOSS, move, resolved)
+
+        # whatever is left can only be escaped into other unresolved
+        # positions, so it is drawn
+        for state in unresolved_moves:
+            if state not in self._outcomes:
+                self._outcomes[state] = DRAW
+        for state, entries in parents.items():
+            for parent, move, _ in entries:
+                if (self._outcomes.get(state) == DRAW and
+                        self._outcomes[parent] == DRAW):
+                    self._best_moves.setdefault(parent, move)
+
+    def _resolve(self, state: ChopsticksCurrentState, outcome: str,
+                 move: str, resolved: deque) -> None:
+        """
+        Record outcome and move as the solution of state, and
+        queue it so its own parents get resolved.
+
+        Positions are resolved in order of distance from the end of the
+        game, so a win is by the quickest move and a loss by the slowest.
+        """
+        self._outcomes[state] = outcome
+        self._best_moves[state] = move
+        resolved.append(state)
+
+    def outcome(self, state: ChopsticksCurrentState) -> str:
+        """
+        Return WIN, LOSS or DRAW for the player whose turn it is in state
+        """
+        return self._outcomes[state]
+
+    def best_move(self, state: ChopsticksCurrentState) -> str:
+        """
+        Return the move giving the player whose turn it is in state its
+        best outcome
+        """
+        return self._best_moves[state]
+
+    if __name__ == "__main__":
+        import python_ta
+        python_ta.check_all(config="a1_pyta.txt")
@@ -328,6 +328,89 @@ class ChopsticksUnitTests(unittest.TestCase):
                          "After calling make_move, the current_state of a " +
                          "game should not be changed.")
 
+    def test_repetition_draw(self):
+        """
+        Test that a game whose position occurs a third time is drawn, and
+        that a game is drawn once it reaches its move limit.
+        """
+        game = ChopsticksGame(True)
+        cycle = ["lr", "rl", "lr", "rl"]
+        for move in ["ll", "ll"] + cycle:
+            game.record_move(game.current_state.make_move(move))
+        self.assertFalse(game.is_draw(), "A position occurring twice " +
+                         "should not draw the game.")
+        for move in cycle:
+            game.record_move(game.current_state.make_move(move))
+        self.assertTrue(game.is_draw(), "A position occurring a third " +
+                        "time should draw the game.")
+        self.assertTrue(game.is_winner("draw"))
+        self.assertFalse(game.is_winner("p1") or game.is_winner("p2"))
+
+        game = ChopsticksGame(True)
+        game.move_limit = 1
+        game.record_move(game.current_state.make_move("ll"))
+        self.assertTrue(game.is_draw(), "A game should be drawn once it " +
+                        "reaches its move limit.")
+
+        game = ChopsticksGame(True)
+        game.move_limit = 3
+        game.current_state = game.current_state
+        game.current_state = game.current_state
+        self.assertFalse(game.is_draw(), "Setting up a position should " +
+                         "not count as a move.")
+
+    def test_search_state_apply_undo(self):
+        """
+        Test that apply() on a search state reaches the same positions as
+        make_move(), and that undo() puts back every position exactly.
+        """
+        from search_state import search_state
+        game = ChopsticksGame(True)
+        search = search_state(game.current_state)
+        states = [game.current_state]
+        while not states[-1].is_over() and len(states) < 30:
+            code = states[-1].get_move_codes()[-1]
+            search.apply(code)
+            states.append(states[-1].make_move(
+                states[-1].code_to_move(code)))
+            self.assertEqual(states[-1], search.to_state(),
+                             "apply() should reach the position make_move() "
+                             "returns.")
+        for state in reversed(states[:-1]):
+            search.undo()
+            self.assertEqual(state, search.to_state(),
+                             "undo() should restore the position before the "
+                             "last move.")
+
+    def test_state_copy_and_pickle(self):
+        """
+        Test that states survive copy, deepcopy and a pickle round trip,
+        as they must to cross process boundaries.
+        """
+        import copy
+        import pickle
+        game = ChopsticksGame(True)
+        state = game.current_state.make_move("ll")
+        for copied in (copy.copy(state), copy.deepcopy(state),
+                       pickle.loads(pickle.dumps(state))):
+            self.assertEqual(copied, state)
+            self.assertEqual(copied.is_p1_turn, state.is_p1_turn)
+            self.assertEqual(self.extract_chopsticks_value(copied),
+                             self.extract_chopsticks_value(state))
+
+    def test_invalid_hands_rejected(self):
+        """
+        Test that a state can only be made from four hand values from 0
+        to 4.
+        """
+        from chopsticks_current_state import ChopsticksCurrentState
+        for hands in ([0, 5, 1, 1], [1, 1, 1], [1, 1, 1, 1, 1], [-1, 1, 1, 1]):
+            with self.assertRaises(ValueError, msg="{} should not be a "
+                                   "state.".format(hands)):
+                ChopsticksCurrentState(True, hands)
+            with self.assertRaises(ValueError):
+                ChopsticksCurrentState.intern(True, hands)
+
     def test_chopsticks_is_valid_move_true(self):
         """
         Test is_valid_move() to make sure all of the possible moves are valid.
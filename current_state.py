@@ -1,38 +1,74 @@
 """
 Current State Interface Module
 """
-from typing import Any, List
+from collections import deque
+from random import Random
+from typing import Any, Deque, Hashable, List, Optional
+from weakref import WeakValueDictionary
 
 
 class CurrentState:
     """
     Class that manages the state of the game it is contained within
 
+    States are immutable and keep only their turn and value in __slots__,
+    so many of them can be held at once. Subclasses set their own slots
+    in __init__ through object.__setattr__.
+
     is_p1_turn - Whether or not it is player 1's turn
-    current_player - The current player
+    current_player - The current player, derived from is_p1_turn
+    current_value - The value of the game, set by subclasses
     """
 
+    __slots__ = ('is_p1_turn', '__weakref__')
+
     is_p1_turn: bool
-    current_player: str
+    current_value: Any
 
     def __init__(self, is_p1_turn: bool) -> None:
         """
         Initialize the state of a game
         """
-        self.is_p1_turn = is_p1_turn
-        if is_p1_turn:
-            self.current_player = "p1"
-        else:
-            self.current_player = "p2"
+        object.__setattr__(self, 'is_p1_turn', is_p1_turn)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Refuse to change self, since states are immutable
+        """
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        """
+        Refuse to change self, since states are immutable
+        """
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    @property
+    def current_player(self) -> str:
+        """
+        Return the name of the current player, "p1" or "p2"
+        """
+        if self.is_p1_turn:
+            return "p1"
+        return "p2"
 
     def __eq__(self, other: Any) -> bool:
         """
-        Return true if self is equal to other
+        Return true if self is equal to other, that is if they are states of
+        the same game with the same turn and value
         """
         if type(self) != type(other):
             return False
 
-        return str(self) == str(other)
+        return (self.is_p1_turn == other.is_p1_turn and
+                self.current_value == other.current_value)
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of self consistent with __eq__, so states can be used
+        as dict keys and set members
+        """
+        return hash((self.is_p1_turn, self.current_value))
 
     def __str__(self) -> str:
         """
@@ -53,11 +89,19 @@ class CurrentState:
         """
         raise NotImplementedError("Subclass Needed")
 
+    def is_over(self) -> bool:
+        """
+        Return True if no move can be made from self
+        """
+        raise NotImplementedError("Subclass Needed")
+
     def get_current_player_name(self) -> str:
         """
         Return a string Indicating who the current player is
         """
-        return self.current_player
+        if self.is_p1_turn:
+            return "p1"
+        return "p2"
 
     def make_move(self, move_to_make: Any) -> Any:
         """
@@ -65,6 +109,94 @@ class CurrentState:
         """
         raise NotImplementedError("Subclass Needed")
 
+    def get_move_codes(self) -> List[int]:
+        """
+        Return the possible moves encoded as small ints, the form searches
+        use internally; moves keep their own form only at the console
+        """
+        raise NotImplementedError("Subclass Needed")
+
+    def make_move_code(self, code: int) -> 'CurrentState':
+        """
+        Return the state the move encoded as code leads to
+        """
+        raise NotImplementedError("Subclass Needed")
+
+    def sample_move_code(self, rng: Random) -> int:
+        """
+        Return the code of a move picked uniformly at random with rng. This
+        version picks from get_move_codes; subclasses can pick without
+        listing every move.
+        """
+        return rng.choice(self.get_move_codes())
+
+    def sample_move(self, rng: Random) -> Any:
+        """
+        Return a move picked uniformly at random with rng
+        """
+        return self.code_to_move(self.sample_move_code(rng))
+
+    def move_to_code(self, move: Any) -> int:
+        """
+        Return the int code of move
+        """
+        raise NotImplementedError("Subclass Needed")
+
+    def code_to_move(self, code: int) -> Any:
+        """
+        Return the move encoded as code
+        """
+        raise NotImplementedError("Subclass Needed")
+
     if __name__ == "__main__":
         import python_ta
         python_ta.check_all(config="a1_pyta.txt")
+
+
+class StateCache:
+    """
+    A bounded cache of canonical states, so that equal states made through
+    it are one shared object which can be compared by identity and keeps
+    whatever it has cached about itself
+
+    The last size states added are kept alive by the cache; older ones
+    stay canonical only as long as something else still uses them.
+
+    >>> from subtract_square_current_state import SubtractSquareCurrentState
+    >>> cache = StateCache(2)
+    >>> cache.get(20) is None
+    True
+    >>> state = cache.add(20, SubtractSquareCurrentState(True, 20))
+    >>> cache.get(20) is state
+    True
+    """
+
+    _states: WeakValueDictionary
+    _recent: Deque[Any]
+
+    def __init__(self, size: int) -> None:
+        """
+        Initialize an empty cache keeping the last size states alive
+        """
+        self._states = WeakValueDictionary()
+        self._recent = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """
+        Return the number of states in the cache
+        """
+        return len(self._states)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the canonical state for key, or None if there is none
+        """
+        return self._states.get(key)
+
+    def add(self, key: Hashable, state: Any) -> Any:
+        """
+        Make state the canonical state for key, and return it
+        """
+        self._states[key] = state
+        self._recent.append(state)
+        return state
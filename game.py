@@ -1,20 +1,83 @@
 """Module for game superclass
 
 """
-from typing import Any
+from random import Random
+from typing import Any, Dict, Optional
 
 
 class Game:
     """
     Superclass for games that can be used by game_interface
 
+    Every move made with record_move moves the game to the state it leads
+    to and tallies that position by its hash, as well as the position the
+    first move was made from. An unfinished game is drawn once its current
+    position has occurred repetition_limit times, or once move_limit moves
+    have been made, so games whose positions repeat (as in Chopsticks)
+    always end. Assigning current_state directly sets up a position without
+    counting a move.
+
     is_p1_turn - whether or not it is player 1's turn
+    current_state - the current state of the game
+    rng - the random number generator randomized strategies draw from,
+    shared by every game unless a game is given its own (e.g. to seed it)
+    repetition_limit - the occurrences of one position that draw the game,
+    or None for no limit
+    move_limit - the number of moves that draws the game, or None for no
+    limit
+    move_count - the number of moves made so far
     """
 
     is_p1_turn: bool
+    current_state: Any
+    rng: Random = Random()
+    repetition_limit: Optional[int] = 3
+    move_limit: Optional[int] = None
+    move_count: int
+    _positions: Dict[Any, int]
 
     def __init__(self, is_p1_turn: bool) -> None:
         self.p1_turn = is_p1_turn
+        self.move_count = 0
+        self._positions = {}
+
+    def record_move(self, state: Any) -> None:
+        """
+        Move the game to state, the state a move made in current_state led
+        to, counting the move and another occurrence of state
+        """
+        if not self._positions:
+            self._positions[self.current_state] = 1
+        self.current_state = state
+        self.move_count += 1
+        self._positions[state] = self._positions.get(state, 0) + 1
+
+    def is_draw(self) -> bool:
+        """
+        Return True if the game is unfinished but drawn by repetition or by
+        the move limit
+
+        >>> from chopsticks_game import ChopsticksGame
+        >>> game = ChopsticksGame(True)
+        >>> for move in ['ll', 'll'] + ['lr', 'rl', 'lr', 'rl'] * 2:
+        ...     game.record_move(game.current_state.make_move(move))
+        >>> game.is_draw(), game.is_winner("draw"), game.move_count
+        (True, True, 10)
+        >>> game = ChopsticksGame(True)
+        >>> game.move_limit = 3
+        >>> game.current_state = game.current_state
+        >>> game.current_state = game.current_state
+        >>> game.is_draw(), game.move_count
+        (False, 0)
+        """
+        if self.is_over(self.current_state):
+            return False
+        if self.move_limit is not None and \
+                self.move_count >= self.move_limit:
+            return True
+        return self.repetition_limit is not None and \
+            self._positions.get(self.current_state, 1) >= \
+            self.repetition_limit
 
     def __eq__(self, other: Any) -> bool:
         if type(self) != type(other):
@@ -32,7 +95,8 @@ class Game:
 
     def is_winner(self, player: str) -> bool:
         """
-        Return True if the string player is the winner of the game
+        Return True if the string player is the winner of the game, or if
+        player is "draw" and the game is drawn
         """
         raise NotImplementedError("Subclass Needed")
 
@@ -1,11 +1,12 @@
 from strategy import *
-from typing import Any, Callable
+from typing import Any, Callable, Dict, Optional
 from game import Game
 from current_state import CurrentState
 from subtract_square_game import SubtractSquareGame
 from subtract_square_current_state import SubtractSquareCurrentState
 from chopsticks_game import ChopsticksGame
 from chopsticks_current_state import ChopsticksCurrentState
+from instrumentation import PlayStats
 
 
 # 's' should map to your implementation of Subtract Square, and 'c' should map
@@ -16,7 +17,11 @@ playable_games = {'s': SubtractSquareGame,
 # The strategies you are to implement.  See strategy.py, and then decide
 # how to modify this.
 usable_strategies = {'r': random_strategy,
-                     'i': interactive_strategy}
+                     'i': interactive_strategy,
+                     'm': minimax_strategy,
+                     's': solver_strategy,
+                     't': mcts_strategy,
+                     'a': alphabeta_strategy}
 
 
 class GameInterface:
@@ -48,17 +53,36 @@ class GameInterface:
         self.p1_strategy = p1_strategy
         self.p2_strategy = p2_strategy
 
-    def play(self) -> None:
+    def play(self, stats: Optional[PlayStats] = None) -> None:
         """
         Play the game.
+
+        If stats is given, the time taken by every strategy call and by
+        every make_move, is_over and is_valid_move is recorded in it, along
+        with how many illegal moves each strategy had to retry. Without
+        stats the calls are made directly, at no extra cost.
         """
         current_state = self.game.current_state
+        is_over = self.game.is_over
+        is_valid_move = type(current_state).is_valid_move
+        make_move = type(current_state).make_move
+        strategies = {'p1': self.p1_strategy, 'p2': self.p2_strategy}
+        if stats is not None:
+            stats.games += 1
+            transitions = stats.transition_times
+            is_over = stats.timed(transitions['is_over'], is_over)
+            is_valid_move = stats.timed(transitions['is_valid_move'],
+                                        is_valid_move)
+            make_move = stats.timed(transitions['make_move'], make_move)
+            for player in strategies:
+                strategies[player] = stats.timed(
+                    stats.strategy_times[player], strategies[player])
 
         print(self.game.get_instructions())
         print(current_state)
 
-        # Pick moves until the game is over
-        while not self.game.is_over(current_state):
+        # Pick moves until the game is over or drawn
+        while not is_over(current_state) and not self.game.is_draw():
             move_to_make = None
 
             # Print out all of the valid moves
@@ -68,16 +92,18 @@ class GameInterface:
                 print(move)
 
             # Pick a (legal) move.
-            while not current_state.is_valid_move(move_to_make):
-                current_strategy = self.p2_strategy
-                if current_state.get_current_player_name() == 'p1':
-                    current_strategy = self.p1_strategy
+            current_player_name = current_state.get_current_player_name()
+            current_strategy = strategies[current_player_name]
+            calls = 0
+            while not is_valid_move(current_state, move_to_make):
                 move_to_make = current_strategy(self.game)
+                calls += 1
+            if stats is not None:
+                stats.retries[current_player_name] += calls - 1
 
             # Apply the move
-            current_player_name = current_state.get_current_player_name()
-            new_game_state = current_state.make_move(move_to_make)
-            self.game.current_state = new_game_state
+            new_game_state = make_move(current_state, move_to_make)
+            self.game.record_move(new_game_state)
             current_state = self.game.current_state
 
             print("{} made the move {}. The game's state is now:".format(
@@ -89,20 +115,28 @@ class GameInterface:
             print("Player 1 is the winner!")
         elif self.game.is_winner("p2"):
             print("Player 2 is the winner!")
+        elif self.game.is_winner("draw"):
+            print("The game is drawn by repetition or the move limit!")
         else:
             print("It's a tie!")
 
 
+def options_menu(options: Dict[str, Any]) -> str:
+    """
+    Return the list of options shown in the console menu, each key with the
+    name of its game or strategy
+
+    >>> options_menu({'s': SubtractSquareGame, 'c': None})
+    "'s': SubtractSquareGame, 'c': None"
+    """
+    return ", ".join(["'{}': {}".format(key, options[key].__name__) if
+                      options[key] is not None else
+                      "'{}': None".format(key) for key in options])
+
+
 if __name__ == '__main__':
-    games = ", ".join(["'{}': {}".format(key, playable_games[key].__name__) if
-                       playable_games[key] is not None else
-                       "'{}': None".format(key) for key in playable_games])
-
-    strategies = ", ".join(["'{}': {}".format(key,
-                                              usable_strategies[key].__name__)
-                            if usable_strategies[key] is not None else
-                            "'{}': None".format(key)
-                            for key in usable_strategies])
+    games = options_menu(playable_games)
+    strategies = options_menu(usable_strategies)
 
     chosen_game = ''
     while chosen_game not in playable_games.keys():
@@ -0,0 +1,166 @@
+"""
+Game length module
+
+Works out the exact distribution of game lengths between two strategies
+from any state, by propagating probabilities through the transition matrix
+of the positions the game can reach rather than by playing games.
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+import numpy as np
+from current_state import CurrentState
+from game import Game
+from strategy import random_strategy
+from subtract_square_game import SubtractSquareGame
+from subtract_square_current_state import SubtractSquareCurrentState
+from chopsticks_game import ChopsticksGame
+
+# The change in expected lengths below which their iteration has converged
+_TOLERANCE = 1e-12
+
+
+class GameLengths(NamedTuple):
+    """
+    The distribution of the lengths of games from one state
+
+    probabilities - at each index, the probability that the game ends after
+    exactly that many moves
+    unfinished - the probability that the game is still going after the
+    last move counted
+    expected - the expected number of moves, or infinity if the game can go
+    on for ever with a positive probability
+    """
+
+    probabilities: np.ndarray
+    unfinished: float
+    expected: float
+
+
+def _game_for(state: CurrentState) -> Game:
+    """
+    Return a game whose current state is state, for strategies to pick a
+    move in
+    """
+    if isinstance(state, SubtractSquareCurrentState):
+        game = SubtractSquareGame(state.is_p1_turn, state.current_value)
+    else:
+        game = ChopsticksGame(state.is_p1_turn)
+    game.current_state = state
+    return game
+
+
+def _move_probabilities(state: CurrentState,
+                        strategy: Callable[[Game], Any]) \
+        -> List[Tuple[int, float]]:
+    """
+    Return the (move code, probability) pairs of the moves strategy makes
+    in state: every move equally likely for random_strategy, and otherwise
+    the one move strategy returns, as it is taken to be deterministic
+    """
+    if strategy is random_strategy:
+        codes = state.get_move_codes()
+        return [(code, 1.0 / len(codes)) for code in codes]
+    move = strategy(_game_for(state))
+    return [(state.move_to_code(move), 1.0)]
+
+
+def game_lengths(state: CurrentState,
+                 p1_strategy: Callable[[Game], Any] = random_strategy,
+                 p2_strategy: Callable[[Game], Any] = random_strategy,
+                 max_moves: int = 1000) -> GameLengths:
+    """
+    Return the distribution of the lengths of games played from state
+    between p1_strategy and p2_strategy, counted up to max_moves moves.
+
+    Strategies other than random_strategy are taken to be deterministic,
+    such as solver_strategy. The draw rules of Game are not applied: the
+    probability they would cut short is what is left unfinished.
+
+    >>> lengths = game_lengths(SubtractSquareCurrentState(True, 5))
+    >>> lengths.probabilities.tolist()
+    [0.0, 0.0, 0.75, 0.0, 0.0, 0.25]
+    >>> lengths.unfinished, lengths.expected
+    (0.0, 2.75)
+    >>> from strategy import solver_strategy
+    >>> game_lengths(SubtractSquareCurrentState(True, 5), solver_strategy,
+    ...              random_strategy).probabilities.tolist()
+    [0.0, 0.0, 0.5, 0.0, 0.0, 0.5]
+    """
+    # every state the game can reach, indexed in the order they are found,
+    # and the transitions between them with their probabilities
+    indexes: Dict[CurrentState, int] = {state: 0}
+    states = [state]
+    sources, targets, weights = [], [], []
+    index = 0
+    while index < len(states):
+        current = states[index]
+        if not current.is_over():
+            strategy = p1_strategy if current.is_p1_turn else p2_strategy
+            for code, probability in _move_probabilities(current, strategy):
+                child = current.make_move_code(code)
+                if child not in indexes:
+                    indexes[child] = len(states)
+                    states.append(child)
+                sources.append(index)
+                targets.append(indexes[child])
+                weights.append(probability)
+        index += 1
+
+    sources = np.array(sources, dtype=np.int64)
+    targets = np.array(targets, dtype=np.int64)
+    weights = np.array(weights)
+    over = np.array([current.is_over() for current in states])
+    size = len(states)
+
+    probabilities = np.zeros(max_moves + 1)
+    mass = np.zeros(size)
+    mass[0] = 1.0
+    probabilities[0] = mass[over].sum()
+    mass[over] = 0.0
+    for moves in range(1, max_moves + 1):
+        if not mass.any():
+            probabilities = probabilities[:moves]
+            break
+        mass = np.bincount(targets, weights=mass[sources] * weights,
+                           minlength=size)
+        probabilities[moves] = mass[over].sum()
+        mass[over] = 0.0
+    unfinished = float(mass.sum())
+    return GameLengths(probabilities, unfinished,
+                       _expected_length(sources, targets, weights, over))
+
+
+def _expected_length(sources: np.ndarray, targets: np.ndarray,
+                     weights: np.ndarray, over: np.ndarray) -> float:
+    """
+    Return the expected number of moves from the first state to an over
+    one, along the transitions from sources to targets with probabilities
+    weights, or infinity if a state that can never end may be reached
+    """
+    size = len(over)
+    # the states from which an over state can be reached
+    ends = over.copy()
+    changed = True
+    while changed:
+        reached = ends.copy()
+        reached[sources[ends[targets]]] = True
+        changed = bool((reached != ends).any())
+        ends = reached
+    if not ends.all():
+        return float('inf')
+
+    # iterate expected = 1 + expected of the next state to its fixed point
+    expected = np.zeros(size)
+    playing = ~over
+    while True:
+        updated = np.bincount(sources, weights=weights * expected[targets],
+                              minlength=size)
+        updated[playing] += 1.0
+        if np.abs(updated - expected).max() <= \
+                _TOLERANCE * max(1.0, updated[0]):
+            return float(updated[0])
+        expected = updated
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
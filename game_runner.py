@@ -0,0 +1,138 @@
+"""
+Headless game runner module
+
+Plays games between strategies to completion without any console input or
+output, for running large numbers of games programmatically.
+"""
+from random import Random
+from typing import (Any, Callable, Iterator, NamedTuple, Optional, Tuple,
+                    Union)
+from game import Game
+
+
+class GameResult(NamedTuple):
+    """
+    The outcome of one game played by play_game
+
+    winner - "p1", "p2", or "draw" if the game was drawn by repetition or
+    the move limit
+    move_count - the number of moves made
+    moves - the moves made, in order
+    """
+
+    winner: str
+    move_count: int
+    moves: Tuple[Any, ...]
+
+
+def _play(game: Game, p1_strategy: Callable[[Any], Any],
+          p2_strategy: Callable[[Any], Any]) -> GameResult:
+    """
+    Play game to completion or a draw with the given strategies and return
+    its result
+    """
+    current_state = game.current_state
+    moves = []
+    while not game.is_over(current_state) and not game.is_draw():
+        current_strategy = p1_strategy
+        if not current_state.is_p1_turn:
+            current_strategy = p2_strategy
+
+        # Pick a (legal) move.
+        move_to_make = current_strategy(game)
+        while not current_state.is_valid_move(move_to_make):
+            move_to_make = current_strategy(game)
+
+        current_state = current_state.make_move(move_to_make)
+        game.record_move(current_state)
+        moves.append(move_to_make)
+
+    if game.is_winner("p1"):
+        winner = "p1"
+    elif game.is_winner("p2"):
+        winner = "p2"
+    else:
+        winner = "draw"
+    return GameResult(winner, len(moves), tuple(moves))
+
+
+def play_game(game_class: Callable[..., Game],
+              p1_strategy: Callable[[Any], Any],
+              p2_strategy: Callable[[Any], Any],
+              is_p1_turn: bool = True, seed: Optional[int] = None,
+              repetition_limit: Optional[int] = 3,
+              move_limit: Optional[int] = None,
+              **game_args: Any) -> GameResult:
+    """
+    Return the result of one game of game_class between p1_strategy and
+    p2_strategy, created from is_p1_turn and game_args, with the draw rules
+    repetition_limit and move_limit of Game.
+
+    Randomized strategies draw from a generator seeded with seed, so the
+    same seed replays the same game.
+
+    >>> from strategy import random_strategy, solver_strategy
+    >>> from subtract_square_game import SubtractSquareGame
+    >>> play_game(SubtractSquareGame, solver_strategy, random_strategy,
+    ...           current_value=21).winner
+    'p1'
+    >>> first = play_game(SubtractSquareGame, random_strategy,
+    ...                   random_strategy, current_value=50, seed=3)
+    >>> first == play_game(SubtractSquareGame, random_strategy,
+    ...                    random_strategy, current_value=50, seed=3)
+    True
+    >>> first.move_count == len(first.moves)
+    True
+    >>> from chopsticks_game import ChopsticksGame
+    >>> result = play_game(ChopsticksGame, random_strategy, random_strategy,
+    ...                    seed=0, move_limit=5)
+    >>> result.winner, result.move_count
+    ('draw', 5)
+    """
+    game = game_class(is_p1_turn, **game_args)
+    game.repetition_limit = repetition_limit
+    game.move_limit = move_limit
+    if seed is not None:
+        game.rng = Random(seed)
+    return _play(game, p1_strategy, p2_strategy)
+
+
+def play_games(count: int, game_class: Callable[..., Game],
+               p1_strategy: Callable[[Any], Any],
+               p2_strategy: Callable[[Any], Any],
+               is_p1_turn: bool = True,
+               seed: Optional[Union[int, str]] = None,
+               repetition_limit: Optional[int] = 3,
+               move_limit: Optional[int] = None,
+               **game_args: Any) -> Iterator[GameResult]:
+    """
+    Yield the results of count games of game_class between p1_strategy and
+    p2_strategy, all drawing from one generator seeded with seed, with the
+    draw rules repetition_limit and move_limit of Game
+
+    >>> from strategy import random_strategy
+    >>> from subtract_square_game import SubtractSquareGame
+    >>> results = list(play_games(10, SubtractSquareGame, random_strategy,
+    ...                           random_strategy, seed=1, current_value=30))
+    >>> len(results)
+    10
+    >>> all(result.winner in ("p1", "p2") for result in results)
+    True
+    >>> from chopsticks_game import ChopsticksGame
+    >>> results = list(play_games(200, ChopsticksGame, random_strategy,
+    ...                           random_strategy, seed=1))
+    >>> any(result.winner == "draw" for result in results)
+    True
+    """
+    rng = Random(seed)
+    for _ in range(count):
+        game = game_class(is_p1_turn, **game_args)
+        game.rng = rng
+        game.repetition_limit = repetition_limit
+        game.move_limit = move_limit
+        yield _play(game, p1_strategy, p2_strategy)
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
@@ -0,0 +1,135 @@
+"""
+Play instrumentation module
+
+Records how long strategies and state transitions take during
+GameInterface.play, for checking strategies against latency budgets.
+"""
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+# Percentiles reported by PlayStats.summary
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    """
+    Return the percent-th percentile of samples, by the nearest-rank method
+
+    >>> percentile([5.0, 1.0, 3.0, 2.0, 4.0], 50)
+    3.0
+    >>> percentile([5.0, 1.0, 3.0, 2.0, 4.0], 99)
+    5.0
+    >>> percentile([], 50)
+    0.0
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+class PlayStats:
+    """
+    Timings gathered while playing one or more games
+
+    strategy_times - the seconds taken by each call of each player's
+    strategy, by player name
+    transition_times - the seconds taken by each call of make_move, is_over
+    and is_valid_move, by name
+    retries - how many times each player's strategy had to be called again
+    because it gave an illegal move, by player name
+    games - the number of games recorded
+    """
+
+    strategy_times: Dict[str, List[float]]
+    transition_times: Dict[str, List[float]]
+    retries: Dict[str, int]
+    games: int
+
+    def __init__(self) -> None:
+        """
+        Initialize empty stats
+        """
+        self.strategy_times = {'p1': [], 'p2': []}
+        self.transition_times = {'make_move': [], 'is_over': [],
+                                 'is_valid_move': []}
+        self.retries = {'p1': 0, 'p2': 0}
+        self.games = 0
+
+    def timed(self, samples: List[float],
+              func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Return a function calling func that adds how long each call took
+        to samples
+
+        >>> stats = PlayStats()
+        >>> timed_abs = stats.timed(stats.transition_times['is_over'], abs)
+        >>> timed_abs(-3)
+        3
+        >>> len(stats.transition_times['is_over'])
+        1
+        """
+        def timed_func(*args: Any) -> Any:
+            start = perf_counter()
+            result = func(*args)
+            samples.append(perf_counter() - start)
+            return result
+
+        return timed_func
+
+    def merge(self, other: 'PlayStats') -> None:
+        """
+        Add the samples recorded in other to self
+        """
+        for player, samples in other.strategy_times.items():
+            self.strategy_times.setdefault(player, []).extend(samples)
+        for name, samples in other.transition_times.items():
+            self.transition_times.setdefault(name, []).extend(samples)
+        for player, count in other.retries.items():
+            self.retries[player] = self.retries.get(player, 0) + count
+        self.games += other.games
+
+    def over_budget(self, player: str, budget: float) -> int:
+        """
+        Return the number of calls of player's strategy that took longer
+        than budget seconds
+
+        >>> stats = PlayStats()
+        >>> stats.strategy_times['p1'].extend([0.1, 0.5, 0.2])
+        >>> stats.over_budget('p1', 0.15)
+        2
+        """
+        return sum(1 for seconds in self.strategy_times[player]
+                   if seconds > budget)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the count, mean, maximum and PERCENTILES of the samples of
+        every strategy and transition, and the retries of every strategy
+
+        >>> stats = PlayStats()
+        >>> stats.strategy_times['p1'].extend([1.0, 2.0, 3.0, 4.0])
+        >>> stats.retries['p1'] = 2
+        >>> stats.summary()['strategy:p1']
+        {'count': 4, 'mean': 2.5, 'max': 4.0, 'p50': 2.0, 'p90': 4.0, \
+'p99': 4.0, 'retries': 2}
+        """
+        summary = {}
+        for prefix, groups in (('strategy', self.strategy_times),
+                               ('transition', self.transition_times)):
+            for name, samples in groups.items():
+                stats = {'count': len(samples),
+                         'mean': sum(samples) / max(len(samples), 1),
+                         'max': max(samples, default=0.0)}
+                for percent in PERCENTILES:
+                    stats[f'p{percent}'] = percentile(samples, percent)
+                if prefix == 'strategy':
+                    stats['retries'] = self.retries.get(name, 0)
+                summary[f'{prefix}:{name}'] = stats
+        return summary
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
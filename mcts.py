@@ -0,0 +1,197 @@
+"""
+Monte Carlo Tree Search strategy module
+"""
+from math import log, sqrt
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+from current_state import CurrentState
+from game import Game
+
+
+class MCTSNode:
+    """
+    A node of a Monte Carlo search tree
+
+    state - the state of the game at this node
+    parent - the node this one was reached from, or None for the root
+    children - the nodes reached from this one, by move code
+    untried_moves - the codes of the moves from state that have no node yet
+    visits - the number of playouts through this node
+    wins - the playouts through this node won by the player who moved into
+    it, with draws counting as half a win
+    """
+
+    state: CurrentState
+    parent: Optional['MCTSNode']
+    children: Dict[int, 'MCTSNode']
+    untried_moves: List[int]
+    visits: int
+    wins: float
+
+    def __init__(self, state: CurrentState,
+                 parent: Optional['MCTSNode'] = None) -> None:
+        """
+        Initialize an unvisited node for state
+        """
+        self.state = state
+        self.parent = parent
+        self.children = {}
+        self.untried_moves = state.get_move_codes()
+        self.visits = 0
+        self.wins = 0.0
+
+    def best_child(self, exploration: float) -> 'MCTSNode':
+        """
+        Return the child with the highest UCB1 score, trading off its win
+        rate against how little it has been visited
+        """
+        log_visits = log(self.visits)
+        return max(self.children.values(),
+                   key=lambda child: (child.wins / child.visits +
+                                      exploration *
+                                      sqrt(log_visits / child.visits)))
+
+    def find(self, state: CurrentState, depth: int) -> Optional['MCTSNode']:
+        """
+        Return the node for state among self and its descendants at most
+        depth moves below it, or None if there is none
+        """
+        if self.state == state:
+            return self
+        if depth > 0:
+            for child in self.children.values():
+                found = child.find(state, depth - 1)
+                if found is not None:
+                    return found
+        return None
+
+
+class MCTSStrategy:
+    """
+    A strategy choosing moves by Monte Carlo Tree Search, using random
+    playouts through the CurrentState API
+
+    Each call searches until its budget runs out: iterations playouts, or
+    seconds of wall-clock time, whichever comes first. The search tree is
+    kept between calls, and the subtree under the moves actually played is
+    reused for the next one.
+
+    iterations - the most playouts a call makes, or None for no limit
+    seconds - the most time a call takes, or None for no limit
+    exploration - the UCB1 exploration constant
+    playout_limit - the most moves in a playout, after which it is a draw
+    (so cycling Chopsticks playouts end)
+    __name__ - the name shown for the strategy, as strategy functions have
+
+    >>> from subtract_square_game import SubtractSquareGame
+    >>> SubtractSquareGame.rng.seed(1)
+    >>> MCTSStrategy(iterations=500)(SubtractSquareGame(True, 21))
+    '16'
+    """
+
+    iterations: Optional[int]
+    seconds: Optional[float]
+    exploration: float
+    playout_limit: int
+    __name__: str
+    _root: Optional[MCTSNode]
+
+    def __init__(self, iterations: Optional[int] = 1000,
+                 seconds: Optional[float] = None,
+                 exploration: float = sqrt(2),
+                 playout_limit: int = 200) -> None:
+        """
+        Initialize a strategy with the given budget and no search tree
+        """
+        if iterations is None and seconds is None:
+            raise ValueError("MCTSStrategy needs iterations or seconds")
+        self.iterations = iterations
+        self.seconds = seconds
+        self.exploration = exploration
+        self.playout_limit = playout_limit
+        self.__name__ = type(self).__name__
+        self._root = None
+
+    def __call__(self, game: Game) -> Any:
+        """
+        Return the move for game most visited by the search, or a random
+        legal move if the budget ran out before the first playout
+        """
+        state = game.current_state
+        root = None
+        if self._root is not None:
+            # our last move, then the opponent's, lead two levels down
+            root = self._root.find(state, 2)
+        if root is None:
+            root = MCTSNode(state)
+        root.parent = None
+        self._root = root
+
+        deadline = None
+        if self.seconds is not None:
+            deadline = perf_counter() + self.seconds
+        iteration = 0
+        while self.iterations is None or iteration < self.iterations:
+            if deadline is not None and perf_counter() >= deadline:
+                break
+            self._iterate(game, root)
+            iteration += 1
+
+        if not root.children:
+            # the budget allowed no playout, so any legal move will do
+            move = state.sample_move_code(game.rng)
+        else:
+            move = max(root.children,
+                       key=lambda child_move: root.children[child_move].visits)
+        return game.str_to_move(root.state.code_to_move(move))
+
+    def _iterate(self, game: Game, root: MCTSNode) -> None:
+        """
+        Grow the tree under root by one playout, and update the nodes on
+        its way with the result
+        """
+        # select a node to expand
+        node = root
+        while not node.untried_moves and node.children:
+            node = node.best_child(self.exploration)
+
+        # expand it by one untried move
+        if node.untried_moves:
+            index = game.rng.randrange(len(node.untried_moves))
+            move = node.untried_moves[index]
+            node.untried_moves[index] = node.untried_moves[-1]
+            node.untried_moves.pop()
+            child = MCTSNode(node.state.make_move_code(move), node)
+            node.children[move] = child
+            node = child
+
+        winner = self._playout(game, node.state)
+
+        # back up the result
+        while node.parent is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.parent.state.get_current_player_name():
+                node.wins += 1
+            node = node.parent
+        node.visits += 1
+
+    def _playout(self, game: Game, state: CurrentState) -> Optional[str]:
+        """
+        Return the winner of a game played on from state with random moves,
+        or None if it is still going after playout_limit moves
+        """
+        for _ in range(self.playout_limit):
+            if game.is_over(state):
+                # the player named by an over state is its winner
+                return state.get_current_player_name()
+            state = state.make_move_code(state.sample_move_code(game.rng))
+        if game.is_over(state):
+            return state.get_current_player_name()
+        return None
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
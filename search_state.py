@@ -0,0 +1,258 @@
+"""
+Search state module
+
+Mutable positions for deep searches. Where make_move returns a new state,
+a search state changes its one position in place with apply and puts it
+back exactly with undo, so a search can walk a whole tree without making
+an object per node. Moves are the int codes of CurrentState.get_move_codes.
+"""
+from math import isqrt
+from typing import List
+from current_state import CurrentState
+from subtract_square_current_state import (SubtractSquareCurrentState,
+                                           _SQUARES, _count_moves)
+from chopsticks_current_state import (ChopsticksCurrentState, _MOVE_CODES,
+                                      _POSSIBLE_MOVES, _TRANSITIONS)
+
+
+class SearchState:
+    """
+    A position that moves are applied to and undone in place
+
+    is_p1_turn - whether or not it is player 1's turn
+    """
+
+    is_p1_turn: bool
+
+    def key(self) -> int:
+        """
+        Return an int identifying the turn and value of the position, equal
+        for equal positions of the same game
+        """
+        raise NotImplementedError("Subclass Needed")
+
+    def get_move_codes(self) -> List[int]:
+        """
+        Return the codes of the moves that can be applied
+        """
+        raise NotImplementedError("Subclass Needed")
+
+    def is_over(self) -> bool:
+        """
+        Return True if no move can be applied. As with CurrentState, the
+        player whose turn it is then is the winner.
+        """
+        raise NotImplementedError("Subclass Needed")
+
+    def apply(self, code: int) -> None:
+        """
+        Make the move encoded as code in place, raising ValueError if it is
+        not possible
+        """
+        raise NotImplementedError("Subclass Needed")
+
+    def undo(self) -> None:
+        """
+        Take back the last move applied and not yet undone, raising
+        IndexError if there is none
+        """
+        raise NotImplementedError("Subclass Needed")
+
+    def to_state(self) -> CurrentState:
+        """
+        Return the immutable state of the current position
+        """
+        raise NotImplementedError("Subclass Needed")
+
+
+class SubtractSquareSearchState(SearchState):
+    """
+    A Subtract Square position to search in place
+
+    current_value - the current value of the game
+
+    >>> search = SubtractSquareSearchState(SubtractSquareCurrentState(True, 5))
+    >>> search.apply(4)
+    >>> search.current_value, search.is_p1_turn
+    (1, False)
+    >>> search.apply(1)
+    >>> search.is_over(), search.is_p1_turn
+    (True, False)
+    >>> search.undo()
+    >>> search.undo()
+    >>> search.to_state() == SubtractSquareCurrentState(True, 5)
+    True
+    """
+
+    current_value: int
+    _history: List[int]
+
+    def __init__(self, state: SubtractSquareCurrentState) -> None:
+        """
+        Initialize a search starting from state
+        """
+        self.is_p1_turn = state.is_p1_turn
+        self.current_value = state.current_value
+        self._history = []
+
+    def key(self) -> int:
+        """
+        Return the turn and value packed as value * 2 + turn
+
+        >>> SubtractSquareSearchState(SubtractSquareCurrentState(True, 3)).key()
+        7
+        """
+        return self.current_value * 2 + (1 if self.is_p1_turn else 0)
+
+    def get_move_codes(self) -> List[int]:
+        """
+        Return the squares that can be subtracted
+
+        >>> SubtractSquareSearchState(
+        ...     SubtractSquareCurrentState(True, 10)).get_move_codes()
+        [1, 4, 9]
+        """
+        return _SQUARES[:_count_moves(self.current_value)]
+
+    def is_over(self) -> bool:
+        """
+        Return True if the value has reached 0
+        """
+        return self.current_value == 0
+
+    def apply(self, code: int) -> None:
+        """
+        Subtract the square code from the value. The turn switches unless
+        the move wins the game.
+
+        >>> search = SubtractSquareSearchState(
+        ...     SubtractSquareCurrentState(True, 3))
+        >>> search.apply(4)
+        Traceback (most recent call last):
+        ...
+        ValueError: 4 is not a possible move
+        """
+        square = code
+        if square < 1 or square > self.current_value or \
+                isqrt(square) ** 2 != square:
+            raise ValueError(f'{code!r} is not a possible move')
+        self._history.append(self.key())
+        self.current_value -= square
+        if self.current_value:
+            self.is_p1_turn = not self.is_p1_turn
+
+    def undo(self) -> None:
+        """
+        Take back the last move applied
+        """
+        key = self._history.pop()
+        self.current_value = key >> 1
+        self.is_p1_turn = key & 1 == 1
+
+    def to_state(self) -> SubtractSquareCurrentState:
+        """
+        Return the interned immutable state of the current position
+        """
+        return SubtractSquareCurrentState.intern(self.is_p1_turn,
+                                                 self.current_value)
+
+
+class ChopsticksSearchState(SearchState):
+    """
+    A Chopsticks position to search in place, kept as its packed code and
+    moved through the transition table
+
+    >>> search = ChopsticksSearchState(ChopsticksCurrentState(True))
+    >>> search.apply(0)
+    >>> search.to_state().current_value, search.is_p1_turn
+    ([1, 1, 2, 1], False)
+    >>> search.undo()
+    >>> search.to_state() == ChopsticksCurrentState(True)
+    True
+    """
+
+    _code: int
+    _history: List[int]
+
+    def __init__(self, state: ChopsticksCurrentState) -> None:
+        """
+        Initialize a search starting from state
+        """
+        self._code = state._code
+        self.is_p1_turn = state.is_p1_turn
+        self._history = []
+
+    def key(self) -> int:
+        """
+        Return the packed code of the position
+        """
+        return self._code
+
+    def get_move_codes(self) -> List[int]:
+        """
+        Return the indexes in ll, lr, rl, rr of the moves that can be made
+
+        >>> ChopsticksSearchState(ChopsticksCurrentState(
+        ...     True, [0, 1, 2, 4])).get_move_codes()
+        [2, 3]
+        """
+        return list(_MOVE_CODES[self._code])
+
+    def is_over(self) -> bool:
+        """
+        Return True if one player's hands are both dead
+        """
+        return not _POSSIBLE_MOVES[self._code]
+
+    def apply(self, code: int) -> None:
+        """
+        Make the move with index code in ll, lr, rl, rr by looking up the
+        position it leads to
+
+        >>> ChopsticksSearchState(ChopsticksCurrentState(
+        ...     True, [0, 1, 2, 4])).apply(0)
+        Traceback (most recent call last):
+        ...
+        ValueError: 0 is not a possible move
+        """
+        move = code
+        code = -1
+        if 0 <= move < 4:
+            code = _TRANSITIONS[self._code * 4 + move]
+        if code < 0:
+            raise ValueError(f'{move!r} is not a possible move')
+        self._history.append(self._code)
+        self._code = code
+        self.is_p1_turn = code & 1 == 1
+
+    def undo(self) -> None:
+        """
+        Take back the last move applied
+        """
+        self._code = self._history.pop()
+        self.is_p1_turn = self._code & 1 == 1
+
+    def to_state(self) -> ChopsticksCurrentState:
+        """
+        Return the canonical immutable state of the current position
+        """
+        return ChopsticksCurrentState._from_code(self._code)
+
+
+def search_state(state: CurrentState) -> SearchState:
+    """
+    Return a search state starting from the position of state
+
+    >>> search_state(ChopsticksCurrentState(False)).is_p1_turn
+    False
+    """
+    if isinstance(state, SubtractSquareCurrentState):
+        return SubtractSquareSearchState(state)
+    if isinstance(state, ChopsticksCurrentState):
+        return ChopsticksSearchState(state)
+    raise TypeError(f'no search state for {type(state).__name__}')
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
@@ -0,0 +1,258 @@
+"""
+Solution database module
+
+Saves the tables of SubtractSquareSolver and ChopsticksSolver to disk in a
+compact binary format, and loads them back through mmap, so a process can
+answer from a solved table without solving again. Pages are only read from
+disk when used, and are shared by every process mapping the same file.
+
+A Subtract Square file is a 16-byte header (the magic bytes SSQ1, a flags
+byte, three reserved bytes and the limit as a little-endian unsigned 64-bit
+int), then a bitset with bit n set if n is a losing (P-) position, padded
+to a multiple of 8 bytes. If bit 0 of the flags is set, the root of the
+winning square of every value follows as a little-endian unsigned 16-bit
+int (0 for losing values); otherwise winning moves are found from the
+bitset when asked for.
+
+A Chopsticks file is the magic bytes CHP1 followed by two bytes for every
+packed position of chopsticks_current_state, in order: its outcome (0 loss,
+1 win, 2 draw) and the index of its best move in _MOVES. Positions where
+both players' hands are dead cannot occur and are left as zeros.
+"""
+import mmap
+import sys
+from array import array
+from math import isqrt
+from typing import Any, Optional, Union
+from chopsticks_current_state import (ChopsticksCurrentState, _MOVES,
+                                      _MOVE_INDEXES, _POSITIONS, _HANDS)
+from chopsticks_solver import ChopsticksSolver, WIN, LOSS, DRAW
+from subtract_square_solver import (SubtractSquareSolver,
+                                    SubtractSquareBitsetSolver)
+
+_SUBTRACT_SQUARE_MAGIC = b'SSQ1'
+_CHOPSTICKS_MAGIC = b'CHP1'
+_HEADER_SIZE = 16
+_OUTCOMES = (LOSS, WIN, DRAW)
+# The flag set in a Subtract Square header when the roots are saved
+_HAS_ROOTS = 1
+
+
+def _bitset_size(limit: int) -> int:
+    """
+    Return the bytes taken by the bitset of values 0 to limit, padded to
+    a multiple of 8
+
+    >>> _bitset_size(0), _bitset_size(64), _bitset_size(100)
+    (8, 16, 16)
+    """
+    return (limit + 64) // 64 * 8
+
+
+def _map(path: str) -> mmap.mmap:
+    """
+    Return a read-only memory map of the file at path
+    """
+    with open(path, 'rb') as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _little_endian(data: array) -> bytes:
+    """
+    Return the items of data as little-endian bytes
+    """
+    if sys.byteorder == 'big':
+        data = array(data.typecode, data)
+        data.byteswap()
+    return data.tobytes()
+
+
+def _pack_bits(flags: bytes) -> int:
+    """
+    Return the int with bit n set if flags[n] is 1, where every byte of
+    flags is 0 or 1 and there are a multiple of 8 of them. The bytes with
+    n % 8 == bit are one strided slice, which bytes.translate maps to that
+    bit of every byte at once.
+
+    >>> hex(_pack_bits(bytes([1, 0, 1, 0, 0, 1, 0, 1]) + bytes([1]) * 8))
+    '0xffa5'
+    """
+    bits = 0
+    for bit in range(8):
+        table = bytes([0, 1 << bit]) + bytes(254)
+        bits |= int.from_bytes(flags[bit::8].translate(table), 'little')
+    return bits
+
+
+def save_subtract_square(solver: Union[SubtractSquareSolver,
+                                       SubtractSquareBitsetSolver],
+                         path: str) -> None:
+    """
+    Save the table of solver to the file at path: the roots of the winning
+    squares as well for a SubtractSquareSolver, and only the bitset for a
+    SubtractSquareBitsetSolver, which has no roots to save
+    """
+    limit = solver.limit
+    size = _bitset_size(limit)
+    flags = 0
+    roots = b''
+    if isinstance(solver, SubtractSquareBitsetSolver):
+        bitset = int.from_bytes(solver._losing[:size], 'little')
+    else:
+        if isqrt(limit) >= 1 << 16:
+            raise ValueError("Roots of the winning squares must fit 16 bits")
+        roots = _little_endian(array('H', solver._roots[:limit + 1]))
+        # a value is losing if both bytes of its root are 0
+        zero = bytes([1]) + bytes(255)
+        losing = (int.from_bytes(roots[0::2].translate(zero), 'little') &
+                  int.from_bytes(roots[1::2].translate(zero), 'little'))
+        bitset = _pack_bits(losing.to_bytes(8 * size, 'little'))
+        flags = _HAS_ROOTS
+    # clear the values past limit a solver may have solved
+    bitset &= (1 << limit + 1) - 1
+
+    with open(path, 'wb') as file:
+        file.write(_SUBTRACT_SQUARE_MAGIC + bytes([flags]) + bytes(3) +
+                   limit.to_bytes(8, 'little'))
+        file.write(bitset.to_bytes(size, 'little'))
+        file.write(roots)
+
+
+class SubtractSquareDatabase:
+    """
+    A Subtract Square table loaded from a file saved by
+    save_subtract_square, answering like a SubtractSquareSolver for the
+    values it covers
+
+    limit - the largest value the table covers
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'subtract_square.db')
+    >>> save_subtract_square(SubtractSquareSolver(100), path)
+    >>> database = SubtractSquareDatabase(path)
+    >>> database.limit
+    100
+    >>> database.is_winning(20), database.is_winning(21)
+    (False, True)
+    >>> database.winning_move(21)
+    16
+    >>> save_subtract_square(SubtractSquareBitsetSolver(100), path)
+    >>> database = SubtractSquareDatabase(path)
+    >>> database.is_winning(20), database.winning_move(21)
+    (False, 16)
+    """
+
+    limit: int
+    _data: Any
+    _roots_offset: Optional[int]
+
+    def __init__(self, path: str) -> None:
+        """
+        Map the table in the file at path
+        """
+        self._data = _map(path)
+        if self._data[:4] != _SUBTRACT_SQUARE_MAGIC:
+            raise ValueError(f"{path} is not a Subtract Square database")
+        self.limit = int.from_bytes(self._data[8:16], 'little')
+        self._roots_offset = None
+        if self._data[4] & _HAS_ROOTS:
+            self._roots_offset = _HEADER_SIZE + _bitset_size(self.limit)
+
+    def _check(self, value: int) -> None:
+        """
+        Raise ValueError if value is outside the table
+        """
+        if not 0 <= value <= self.limit:
+            raise ValueError(f"{value} is outside the table (0 to "
+                             f"{self.limit})")
+
+    def _is_losing(self, value: int) -> bool:
+        """
+        Return True if value, which must be in the table, is losing
+        """
+        return self._data[_HEADER_SIZE + (value >> 3)] >> (value & 7) & 1 == 1
+
+    def is_winning(self, value: int) -> bool:
+        """
+        Return True if the player to move wins from value with perfect play
+        """
+        self._check(value)
+        return not self._is_losing(value)
+
+    def winning_move(self, value: int) -> int:
+        """
+        Return a square whose subtraction from value leaves the opponent
+        losing, or 0 if value is a losing position
+        """
+        self._check(value)
+        if self._roots_offset is None:
+            for root in range(isqrt(value), 0, -1):
+                if self._is_losing(value - root * root):
+                    return root * root
+            return 0
+        offset = self._roots_offset + 2 * value
+        root = int.from_bytes(self._data[offset:offset + 2], 'little')
+        return root * root
+
+
+def save_chopsticks(solver: ChopsticksSolver, path: str) -> None:
+    """
+    Save the outcomes and best moves of solver to the file at path
+    """
+    data = bytearray(_CHOPSTICKS_MAGIC)
+    for code in range(_POSITIONS):
+        hands = _HANDS[code]
+        if hands == (0, 0, 0, 0):
+            data += bytes(2)
+            continue
+        state = ChopsticksCurrentState._from_code(code)
+        data.append(_OUTCOMES.index(solver.outcome(state)))
+        data.append(_MOVE_INDEXES[solver.best_move(state)]
+                    if not state.is_over() else 0)
+
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+class ChopsticksDatabase:
+    """
+    A Chopsticks table loaded from a file saved by save_chopsticks,
+    answering like a ChopsticksSolver
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'chopsticks.db')
+    >>> save_chopsticks(ChopsticksSolver(), path)
+    >>> database = ChopsticksDatabase(path)
+    >>> database.outcome(ChopsticksCurrentState(True, [1, 4, 0, 1]))
+    'win'
+    >>> database.best_move(ChopsticksCurrentState(True, [1, 4, 0, 1]))
+    'rr'
+    """
+
+    _data: Any
+
+    def __init__(self, path: str) -> None:
+        """
+        Map the table in the file at path
+        """
+        self._data = _map(path)
+        if self._data[:4] != _CHOPSTICKS_MAGIC:
+            raise ValueError(f"{path} is not a Chopsticks database")
+
+    def outcome(self, state: ChopsticksCurrentState) -> str:
+        """
+        Return WIN, LOSS or DRAW for the player whose turn it is in state
+        """
+        return _OUTCOMES[self._data[4 + 2 * state._code]]
+
+    def best_move(self, state: ChopsticksCurrentState) -> str:
+        """
+        Return the move giving the player whose turn it is in state its
+        best outcome
+        """
+        return _MOVES[self._data[5 + 2 * state._code]]
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
@@ -1,8 +1,41 @@
 """
 Game strategy implementation module
 """
-from random import choice
+from heapq import heappop, heappush
+from itertools import count
+from typing import Any, Dict, Optional, Union
 from game import Game
+from current_state import CurrentState
+from subtract_square_current_state import SubtractSquareCurrentState
+from subtract_square_solver import SubtractSquareSolver
+from chopsticks_current_state import ChopsticksCurrentState
+from chopsticks_solver import ChopsticksSolver
+from mcts import MCTSStrategy
+from alphabeta import AlphaBetaStrategy
+from solution_db import ChopsticksDatabase, SubtractSquareDatabase
+
+# Scores of the states searched so far by minimax_strategy, seen from the
+# point of view of the player whose turn it is in that state: 1 for a win,
+# -1 for a loss and 0 for a draw. It is shared between moves and games, so
+# a state is only ever scored once.
+_transpositions: Dict[CurrentState, int] = {}
+
+# The number of moves from each won or lost state in _transpositions to the
+# end of the game, with the winner hurrying and the loser holding out
+_distances: Dict[CurrentState, int] = {}
+
+# Win/loss table used by solver_strategy for Subtract Square, grown as larger
+# values are played
+_subtract_square_solver = SubtractSquareSolver()
+
+# Saved Subtract Square table loaded by load_solutions, which solver_strategy
+# answers from for the values it covers
+_subtract_square_database: Optional[SubtractSquareDatabase] = None
+
+# Outcome table used by solver_strategy for Chopsticks, built on first use
+# unless load_solutions loads a saved one
+_chopsticks_solver: Optional[Union[ChopsticksSolver,
+                                   ChopsticksDatabase]] = None
 
 
 def interactive_strategy(game: Game) -> str:
@@ -17,12 +50,162 @@ def random_strategy(game: Game) -> str:
     """
     Return a random move for the game
     """
-    possible_moves = game.current_state.get_possible_moves()
-    move = choice(possible_moves)
+    move = game.current_state.sample_move(game.rng)
 
     return game.str_to_move(move)
 
 
+def _relative_score(parent: CurrentState, child: CurrentState,
+                    child_score: int) -> int:
+    """
+    Return child_score, the score of child for the player whose turn it is
+    in child, seen from the point of view of the player to move in parent
+    """
+    if child.is_p1_turn == parent.is_p1_turn:
+        return child_score
+    return -child_score
+
+
+def _score(game: Game, state: CurrentState) -> int:
+    """
+    Return the score of state for the player whose turn it is in state.
+
+    Once a game is over, the player named by its state is the winner, so an
+    over state scores 1. A state with a child that wins for its player
+    scores 1, and one whose children all lose for its player scores -1.
+    Any other state (which happens in Chopsticks, where positions repeat)
+    scores 0, as neither player can force the game out of its cycles.
+
+    The scores are worked out backwards from the over states, over every
+    state reachable from state that is not already in _transpositions, so
+    each score is a fact about its state alone, whatever line it is
+    reached by, and they are all kept. States are scored in order of how
+    many moves they are from the end, so _distances holds the fewest
+    moves to a win and the most to a loss.
+    """
+    if state in _transpositions:
+        return _transpositions[state]
+
+    # the unscored states reachable from state, how many of their moves
+    # are not yet known to lose, and the states moving into each state
+    children_left = {}
+    parents = {}
+    stack = [state]
+    # states scored but not yet used to score their parents, by distance,
+    # with ties taken in the order they were scored
+    resolved = []
+    order = count()
+    while stack:
+        current = stack.pop()
+        if current in children_left or current in _transpositions:
+            continue
+        if game.is_over(current):
+            _transpositions[current] = 1
+            _distances[current] = 0
+            heappush(resolved, (0, next(order), current))
+            continue
+        codes = current.get_move_codes()
+        children_left[current] = len(codes)
+        for code in codes:
+            child = current.make_move_code(code)
+            parents.setdefault(child, []).append(current)
+            if child in _transpositions:
+                if len(parents[child]) == 1 and child in _distances:
+                    heappush(resolved,
+                             (_distances[child], next(order), child))
+            elif child not in children_left:
+                stack.append(child)
+
+    # score parents from their scored children, nearest the end first: one
+    # winning move wins, and a state whose every move loses is lost
+    while resolved:
+        distance, _, child = heappop(resolved)
+        child_score = _transpositions[child]
+        for parent in parents.get(child, ()):
+            if parent in _transpositions:
+                continue
+            score = _relative_score(parent, child, child_score)
+            if score == -1:
+                children_left[parent] -= 1
+            if score == 1 or children_left[parent] == 0:
+                _transpositions[parent] = score
+                _distances[parent] = distance + 1
+                heappush(resolved, (distance + 1, next(order), parent))
+
+    for current in children_left:
+        _transpositions.setdefault(current, 0)
+    return _transpositions[state]
+
+
+def minimax_strategy(game: Game) -> Any:
+    """
+    Return a move for game that leads to the best score the current player
+    can force, assuming the opponent also plays perfectly: the quickest
+    win, or failing that a draw, or failing that the slowest loss
+    """
+    state = game.current_state
+    best_move = None
+    best_rank = None
+    for move in state.get_move_codes():
+        child = state.make_move_code(move)
+        score = _relative_score(state, child, _score(game, child))
+        rank = (score, -score * _distances.get(child, 0))
+        if best_rank is None or rank > best_rank:
+            best_move, best_rank = move, rank
+
+    return game.str_to_move(state.code_to_move(best_move))
+
+
+def load_solutions(subtract_square_path: Optional[str] = None,
+                   chopsticks_path: Optional[str] = None) -> None:
+    """
+    Make solver_strategy answer from the tables saved in the given files
+    (see solution_db) instead of solving. A saved Subtract Square table
+    only covers values up to its limit, and larger values are still solved.
+    """
+    global _subtract_square_database, _chopsticks_solver
+    if subtract_square_path is not None:
+        _subtract_square_database = SubtractSquareDatabase(
+            subtract_square_path)
+    if chopsticks_path is not None:
+        _chopsticks_solver = ChopsticksDatabase(chopsticks_path)
+
+
+def solver_strategy(game: Game) -> Any:
+    """
+    Return a perfect move for game by looking it up in a precomputed
+    win/loss table, falling back to minimax_strategy for games that have no
+    table
+    """
+    global _chopsticks_solver
+    state = game.current_state
+    if isinstance(state, ChopsticksCurrentState):
+        if _chopsticks_solver is None:
+            _chopsticks_solver = ChopsticksSolver()
+        return game.str_to_move(_chopsticks_solver.best_move(state))
+    if not isinstance(state, SubtractSquareCurrentState):
+        return minimax_strategy(game)
+
+    solver = _subtract_square_solver
+    if _subtract_square_database is not None and \
+            state.current_value <= _subtract_square_database.limit:
+        solver = _subtract_square_database
+    square = solver.winning_move(state.current_value)
+    if square == 0:
+        # every move loses against perfect play, so take the smallest
+        square = 1
+    return game.str_to_move(str(square))
+
+
+# Monte Carlo Tree Search with 1000 playouts a move, keeping its search tree
+# from move to move. Use MCTSStrategy directly for other budgets.
+mcts_strategy = MCTSStrategy(iterations=1000)
+
+# Iterative-deepening alpha-beta allowed one second a move. Use
+# AlphaBetaStrategy directly for other deadlines.
+alphabeta_strategy = AlphaBetaStrategy(seconds=1.0)
+
+
 if __name__ == "__main__":
     import python_ta
     python_ta.check_all(config="a1_pyta.txt")
@@ -0,0 +1,359 @@
+import os
+import random
+import tempfile
+import time
+import unittest
+from itertools import product
+from unittest.mock import patch
+
+import strategy
+from strategy import minimax_strategy, solver_strategy, load_solutions
+from solution_db import save_subtract_square, save_chopsticks
+from chopsticks_solver import ChopsticksSolver, WIN, LOSS, DRAW
+from mcts import MCTSStrategy
+from alphabeta import AlphaBetaStrategy
+from game_interface import options_menu, playable_games, usable_strategies
+from win_probability import (win_probability, win_probability_strategy,
+                             chopsticks_probabilities)
+from game_length import game_lengths
+from subtract_square_game import SubtractSquareGame
+from subtract_square_current_state import SubtractSquareCurrentState
+from subtract_square_solver import SubtractSquareSolver
+from chopsticks_game import ChopsticksGame
+from chopsticks_current_state import ChopsticksCurrentState
+
+
+def subtract_square_wins(value):
+    """
+    A helper function that returns whether the player to move wins
+    Subtract Square from value, by brute force.
+    """
+    wins = [False]
+    for n in range(1, value + 1):
+        wins.append(any(not wins[n - k * k]
+                        for k in range(1, int(n ** 0.5) + 1)))
+    return wins[value]
+
+
+class MinimaxStrategyUnitTests(unittest.TestCase):
+    @patch('builtins.input', side_effect=['21'])
+    def test_minimax_subtract_square_winning_move(self, input):
+        """
+        Test minimax_strategy picks a move that leaves the opponent in a
+        losing position when the current value (21) is winning.
+        """
+        game = SubtractSquareGame(True)
+        move = minimax_strategy(game)
+
+        self.assertTrue(game.current_state.is_valid_move(move))
+        new_state = game.current_state.make_move(move)
+        self.assertFalse(subtract_square_wins(new_state.current_value),
+                         "minimax_strategy should leave a losing value " +
+                         "of 21 - {} for the opponent.".format(move))
+
+    @patch('builtins.input', side_effect=['200'])
+    def test_minimax_subtract_square_large_value(self, input):
+        """
+        Test minimax_strategy finishes on values in the hundreds and returns
+        a legal move.
+        """
+        game = SubtractSquareGame(True)
+        move = minimax_strategy(game)
+
+        self.assertTrue(game.current_state.is_valid_move(move))
+
+    def test_minimax_chopsticks_takes_win(self):
+        """
+        Test minimax_strategy finishes a Chopsticks game when it can.
+        """
+        game = ChopsticksGame(True)
+        game.current_state = ChopsticksCurrentState(True, [1, 4, 0, 1])
+        move = minimax_strategy(game)
+        new_state = game.current_state.make_move(move)
+
+        self.assertTrue(game.is_over(new_state))
+        self.assertEqual(new_state.get_current_player_name(), 'p1')
+
+    def test_minimax_chopsticks_handles_cycles(self):
+        """
+        Test minimax_strategy makes a move keeping the outcome
+        ChopsticksSolver finds, from every Chopsticks position, asked in
+        shuffled orders with the transposition table cleared each time.
+        """
+        solver = ChopsticksSolver()
+        flipped = {WIN: LOSS, LOSS: WIN, DRAW: DRAW}
+        states = []
+        for is_p1_turn, hands in product((True, False),
+                                         product(range(5), repeat=4)):
+            if hands[:2] != (0, 0) and hands[2:] != (0, 0):
+                states.append(ChopsticksCurrentState(is_p1_turn,
+                                                     list(hands)))
+        for seed in range(3):
+            strategy._transpositions.clear()
+            random.Random(seed).shuffle(states)
+            for state in states:
+                game = ChopsticksGame(True)
+                game.current_state = state
+                move = minimax_strategy(game)
+                child = state.make_move(move)
+                outcome = solver.outcome(child)
+                if child.is_p1_turn != state.is_p1_turn:
+                    outcome = flipped[outcome]
+                self.assertEqual(solver.outcome(state), outcome,
+                                 "{} from {} changes the outcome".format(
+                                     move, state))
+
+
+class SolverStrategyUnitTests(unittest.TestCase):
+    @patch('builtins.input', side_effect=['1000000'])
+    def test_solver_subtract_square_large_value(self, input):
+        """
+        Test solver_strategy answers on a value in the millions with a move
+        that leaves the opponent losing.
+        """
+        game = SubtractSquareGame(True)
+        move = solver_strategy(game)
+
+        self.assertTrue(game.current_state.is_valid_move(move))
+        new_state = game.current_state.make_move(move)
+        self.assertFalse(SubtractSquareSolver().is_winning(
+            new_state.current_value))
+
+    @patch('builtins.input', side_effect=['200'])
+    def test_solver_matches_minimax(self, input):
+        """
+        Test solver_strategy agrees with brute force on every value up to 200.
+        """
+        game = SubtractSquareGame(True)
+        for value in range(1, 201):
+            game.current_state = SubtractSquareCurrentState(True, value)
+            new_state = game.current_state.make_move(solver_strategy(game))
+            self.assertEqual(subtract_square_wins(value),
+                             not subtract_square_wins(new_state.current_value))
+
+    def test_solver_chopsticks_takes_win(self):
+        """
+        Test solver_strategy finishes a Chopsticks game when it can.
+        """
+        game = ChopsticksGame(False)
+        game.current_state = ChopsticksCurrentState(False, [0, 1, 4, 3])
+        new_state = game.current_state.make_move(solver_strategy(game))
+
+        self.assertTrue(game.is_over(new_state))
+        self.assertEqual(new_state.get_current_player_name(), 'p2')
+
+    def test_solver_loads_saved_solutions(self):
+        """
+        Test solver_strategy answers from saved tables after load_solutions.
+        """
+        directory = tempfile.mkdtemp()
+        subtract_square_path = os.path.join(directory, 'subtract_square.db')
+        chopsticks_path = os.path.join(directory, 'chopsticks.db')
+        save_subtract_square(SubtractSquareSolver(1000), subtract_square_path)
+        save_chopsticks(ChopsticksSolver(), chopsticks_path)
+
+        solvers = (strategy._subtract_square_database,
+                   strategy._chopsticks_solver)
+        try:
+            load_solutions(subtract_square_path, chopsticks_path)
+            game = SubtractSquareGame(True, 21)
+            self.assertEqual(solver_strategy(game), '16')
+            # 5000 is winning, and above the saved limit so it is solved
+            game = SubtractSquareGame(True, 5000)
+            move = solver_strategy(game)
+            self.assertFalse(subtract_square_wins(5000 - int(move)))
+            game = ChopsticksGame(True)
+            game.current_state = ChopsticksCurrentState(True, [1, 4, 0, 1])
+            self.assertEqual(solver_strategy(game), 'rr')
+        finally:
+            (strategy._subtract_square_database,
+             strategy._chopsticks_solver) = solvers
+
+
+class MCTSStrategyUnitTests(unittest.TestCase):
+    def test_mcts_subtract_square_winning_move(self):
+        """
+        Test MCTSStrategy finds the winning move from a small value.
+        """
+        game = SubtractSquareGame(True, 21)
+        game.current_state = game.current_state.make_move('1')
+        game.current_state = game.current_state.make_move('4')
+
+        self.assertEqual(MCTSStrategy(iterations=500)(game), '16')
+
+    def test_mcts_time_budget(self):
+        """
+        Test MCTSStrategy returns a legal move within its time budget on a
+        value too large to solve by search.
+        """
+        game = SubtractSquareGame(True, 100000)
+        move = MCTSStrategy(iterations=None, seconds=0.05)(game)
+
+        self.assertTrue(game.current_state.is_valid_move(move))
+
+    def test_mcts_tiny_budget(self):
+        """
+        Test MCTSStrategy still returns a legal move when its budget allows
+        no playout at all.
+        """
+        for strategy in (MCTSStrategy(iterations=0),
+                         MCTSStrategy(iterations=None, seconds=0.0),
+                         MCTSStrategy(iterations=None, seconds=1e-7)):
+            game = ChopsticksGame(True)
+            move = strategy(game)
+
+            self.assertTrue(game.current_state.is_valid_move(move))
+
+    def test_mcts_reuses_tree(self):
+        """
+        Test MCTSStrategy keeps the subtree under the moves played between
+        calls.
+        """
+        strategy = MCTSStrategy(iterations=200)
+        game = SubtractSquareGame(True, 40)
+        move = strategy(game)
+        game.current_state = game.current_state.make_move(move)
+        game.current_state = game.current_state.make_move('1')
+        previous_root = strategy._root
+        subtree = previous_root.find(game.current_state, 2)
+        strategy(game)
+
+        self.assertIsNotNone(subtree)
+        self.assertIs(strategy._root, subtree)
+
+    def test_console_menu_names_strategies(self):
+        """
+        Test the console menu of game_interface names every game and
+        strategy, MCTSStrategy included.
+        """
+        games = options_menu(playable_games)
+        strategies = options_menu(usable_strategies)
+
+        self.assertIn("'s': SubtractSquareGame", games)
+        self.assertIn("'c': ChopsticksGame", games)
+        self.assertIn("'t': MCTSStrategy", strategies)
+        self.assertIn("'a': AlphaBetaStrategy", strategies)
+
+
+class AlphaBetaStrategyUnitTests(unittest.TestCase):
+    def test_alphabeta_matches_solver(self):
+        """
+        Test AlphaBetaStrategy finds a winning move from every winning value
+        up to 60.
+        """
+        for value in range(1, 61):
+            if subtract_square_wins(value):
+                game = SubtractSquareGame(True, value)
+                move = AlphaBetaStrategy(seconds=1.0)(game)
+                self.assertFalse(subtract_square_wins(value - int(move)),
+                                 "{} is a losing move from {}".format(
+                                     move, value))
+
+    def test_alphabeta_deadline(self):
+        """
+        Test AlphaBetaStrategy returns a legal move close to its deadline
+        on a value too large to search fully.
+        """
+        game = SubtractSquareGame(True, 100000)
+        start = time.perf_counter()
+        move = AlphaBetaStrategy(seconds=0.1)(game)
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertTrue(game.current_state.is_valid_move(move))
+
+    def test_alphabeta_chopsticks_takes_win(self):
+        """
+        Test AlphaBetaStrategy finishes a Chopsticks game when it can.
+        """
+        game = ChopsticksGame(True)
+        game.current_state = ChopsticksCurrentState(True, [1, 4, 0, 1])
+        new_state = game.current_state.make_move(
+            AlphaBetaStrategy(seconds=0.5)(game))
+
+        self.assertTrue(game.is_over(new_state))
+
+
+class WinProbabilityUnitTests(unittest.TestCase):
+    def test_subtract_square_matches_recursion(self):
+        """
+        Test the Subtract Square win probabilities against random_strategy
+        match a direct recursion over every value up to 40.
+        """
+        mover = [1.0]
+        waiting = [0.0]
+        for n in range(1, 41):
+            roots = range(1, int(n ** 0.5) + 1)
+            mover.append(max(1.0 if n == k * k else waiting[n - k * k]
+                             for k in roots))
+            waiting.append(sum(0.0 if n == k * k else mover[n - k * k]
+                               for k in roots) / len(roots))
+        for n in range(1, 41):
+            state = SubtractSquareCurrentState(True, n)
+            self.assertAlmostEqual(mover[n], win_probability(state))
+            self.assertAlmostEqual(waiting[n], win_probability(state, "p2"))
+
+    def test_chopsticks_probabilities_are_consistent(self):
+        """
+        Test every Chopsticks probability is the value of the move picked
+        for the maximizing player, and the average over random moves.
+        """
+        mover, waiting, moves = chopsticks_probabilities()
+        for is_p1_turn in (True, False):
+            for hands in [[1, 1, 1, 1], [1, 2, 3, 4], [0, 3, 2, 1]]:
+                state = ChopsticksCurrentState(is_p1_turn, hands)
+                player = state.get_current_player_name()
+                other = "p2" if player == "p1" else "p1"
+                picked = state.make_move_code(int(moves[state._code]))
+                self.assertAlmostEqual(win_probability(state),
+                                       win_probability(picked, player))
+                children = [state.make_move_code(code)
+                            for code in state.get_move_codes()]
+                self.assertAlmostEqual(
+                    win_probability(state, other),
+                    sum(win_probability(child, other) for child in children)
+                    / len(children))
+
+    def test_strategy_picks_legal_move(self):
+        """
+        Test win_probability_strategy returns a legal move in both games.
+        """
+        for game in [SubtractSquareGame(True, 1000), ChopsticksGame(False)]:
+            move = win_probability_strategy(game)
+            self.assertTrue(game.current_state.is_valid_move(move))
+
+
+class GameLengthUnitTests(unittest.TestCase):
+    def test_subtract_square_lengths_match_recursion(self):
+        """
+        Test the expected length of random Subtract Square games matches a
+        direct recursion, and that every game is counted.
+        """
+        expected = [0.0]
+        for n in range(1, 61):
+            roots = range(1, int(n ** 0.5) + 1)
+            expected.append(1 + sum(expected[n - k * k] for k in roots) /
+                            len(roots))
+        lengths = game_lengths(SubtractSquareCurrentState(True, 60))
+
+        self.assertAlmostEqual(expected[60], lengths.expected)
+        self.assertAlmostEqual(1.0, lengths.probabilities.sum())
+        self.assertEqual(0.0, lengths.unfinished)
+
+    def test_chopsticks_lengths(self):
+        """
+        Test random Chopsticks games can go on for ever, while a game the
+        solver can win ends in one move.
+        """
+        lengths = game_lengths(ChopsticksCurrentState(True), max_moves=100)
+        self.assertEqual(float('inf'), lengths.expected)
+        self.assertAlmostEqual(1.0, lengths.probabilities.sum() +
+                               lengths.unfinished)
+
+        lengths = game_lengths(ChopsticksCurrentState(True, [1, 4, 0, 1]),
+                               solver_strategy)
+        self.assertEqual([0.0, 1.0], lengths.probabilities.tolist())
+        self.assertEqual(1.0, lengths.expected)
+
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -0,0 +1,92 @@
+"""
+Subtract Square batch rollout module
+
+Plays many random-vs-random Subtract Square games at once as NumPy arrays,
+for Monte Carlo evaluation and win-rate estimates.
+"""
+from typing import Any, NamedTuple, Optional
+import numpy as np
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcomes of a batch of games
+
+    p1_wins - for each game, True if Player 1 won it
+    move_counts - for each game, the number of moves made
+    """
+
+    p1_wins: np.ndarray
+    move_counts: np.ndarray
+
+
+def isqrt(values: np.ndarray) -> np.ndarray:
+    """
+    Return the integer square roots of the non-negative int64 values
+
+    >>> isqrt(np.array([0, 1, 3, 4, 24, 25, 10 ** 12 - 1]))
+    array([     0,      1,      1,      2,      4,      5, 999999])
+    """
+    roots = np.sqrt(values.astype(np.float64)).astype(np.int64)
+    roots -= roots * roots > values
+    roots += (roots + 1) * (roots + 1) <= values
+    return roots
+
+
+def random_rollouts(start_values: Any, is_p1_turn: Any = True,
+                    seed: Optional[int] = None) -> BatchResult:
+    """
+    Return the results of one game from each of start_values, with
+    is_p1_turn (one for all games, or one per game) saying who moves first,
+    where both players always pick one of their possible moves at random.
+
+    Every round draws, for all games still going, a root uniformly from 1
+    to the integer square root of the current value and subtracts its
+    square, as random_strategy would. A game whose value reaches 0 is won
+    by the player who made that move.
+
+    >>> result = random_rollouts([0, 1, 2, 3], is_p1_turn=True, seed=0)
+    >>> result.p1_wins
+    array([ True,  True, False,  True])
+    >>> result.move_counts
+    array([0, 1, 2, 3])
+    """
+    values = np.array(start_values, dtype=np.int64)
+    p1_turn = np.broadcast_to(np.asarray(is_p1_turn, dtype=bool),
+                              values.shape).copy()
+    move_counts = np.zeros(values.shape, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+
+    # the player named by an over game is its winner, and the turn only
+    # passes on while the game goes on
+    playing = np.flatnonzero(values > 0)
+    while playing.size:
+        current = values[playing]
+        roots = (rng.random(playing.size) * isqrt(current)).astype(np.int64)
+        current -= (roots + 1) * (roots + 1)
+        values[playing] = current
+        move_counts[playing] += 1
+        still_playing = current > 0
+        playing = playing[still_playing]
+        p1_turn[playing] = ~p1_turn[playing]
+    return BatchResult(p1_turn, move_counts)
+
+
+def win_rate(start_value: int, games: int, is_p1_turn: bool = True,
+             seed: Optional[int] = None) -> float:
+    """
+    Return the fraction of games random players won by Player 1 from
+    start_value, estimated from games rollouts
+
+    >>> win_rate(1, 1000)
+    1.0
+    >>> 0.0 < win_rate(100, 1000, seed=1) < 1.0
+    True
+    """
+    result = random_rollouts(np.full(games, start_value), is_p1_turn, seed)
+    return float(result.p1_wins.mean())
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
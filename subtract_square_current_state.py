@@ -1,8 +1,40 @@
 """Subtract Square Game current state module
 
 """
-from typing import List, Any
-from current_state import CurrentState
+from bisect import bisect_right
+from math import isqrt
+from random import Random
+from typing import FrozenSet, List, Any, Optional, Tuple
+from current_state import CurrentState, StateCache
+
+# Process-wide tables of the squares 1, 4, 9, ..., as ints and as move
+# strings, shared by every state and grown on demand by _count_moves
+_SQUARES: List[int] = [1]
+_SQUARE_MOVES: List[str] = ['1']
+
+
+def _count_moves(value: int) -> int:
+    """
+    Return how many squares are no greater than value, growing the shared
+    square tables first if they do not reach value
+
+    >>> _count_moves(20)
+    4
+    >>> _SQUARES[:4]
+    [1, 4, 9, 16]
+    >>> _count_moves(0)
+    0
+    """
+    if _SQUARES[-1] < value:
+        for root in range(len(_SQUARES) + 1, isqrt(value) + 2):
+            _SQUARES.append(root * root)
+            _SQUARE_MOVES.append(str(root * root))
+    return bisect_right(_SQUARES, value)
+
+
+# Canonical states made by SubtractSquareCurrentState.intern, keyed by
+# value * 2 + turn
+_CACHE = StateCache(1 << 16)
 
 
 class SubtractSquareCurrentState(CurrentState):
@@ -10,35 +42,93 @@ class SubtractSquareCurrentState(CurrentState):
     Current State class for a subtract square game
 
     current_value - the current value of the game
-    moves - a list of possible moves
+    moves - a list of possible moves, derived from current_value
+
+    >>> state = SubtractSquareCurrentState(True, 20)
+    >>> state.current_value = 5
+    Traceback (most recent call last):
+    ...
+    AttributeError: SubtractSquareCurrentState is immutable
     """
 
+    __slots__ = ('current_value', '_moves', '_move_set')
+
     current_value: int
-    moves: List[int]
+    _moves: Optional[Tuple[str, ...]]
+    _move_set: Optional[FrozenSet[Any]]
 
     def __init__(self, is_p1_turn: bool, current_value: int) -> None:
         """
-        This initialize method extends the current_state initializer
+        This initialize method extends the current_state initializer.
+        The moves, and the set of them checked by is_valid_move, are only
+        worked out when first asked for.
         """
         CurrentState.__init__(self, is_p1_turn)
-        self.current_value = current_value
-        self.moves = []
-
-        # formula determining values for the squares
-        # elements and current value - square moves
-        if self.current_value == 1:
-            self.moves.append(1)
-
-        if self.current_value > 1:
-            self.moves.append(1)
-            x = self.moves[-1]
-            distance = 3
-            next_square = x + distance
-            while next_square <= current_value:
-                self.moves.append(next_square)
-                last_element = self.moves[-1]
-                distance += 2
-                next_square = last_element + distance
+        object.__setattr__(self, 'current_value', current_value)
+        object.__setattr__(self, '_moves', None)
+        object.__setattr__(self, '_move_set', None)
+
+    @staticmethod
+    def intern(is_p1_turn: bool,
+               current_value: int) -> 'SubtractSquareCurrentState':
+        """
+        Return the canonical state with the given turn and value, shared
+        with every other caller asking for it while it is in use
+
+        >>> state = SubtractSquareCurrentState.intern(False, 7)
+        >>> state is SubtractSquareCurrentState(True, 8).make_move('1')
+        True
+        """
+        key = current_value * 2 + (1 if is_p1_turn else 0)
+        state = _CACHE.get(key)
+        if state is None:
+            state = _CACHE.add(key, SubtractSquareCurrentState(is_p1_turn,
+                                                               current_value))
+        return state
+
+    def __reduce__(self) -> Tuple[Any, Tuple[bool, int]]:
+        """
+        Return how to rebuild self, as the canonical state with its turn
+        and value, so states can be copied and pickled despite refusing
+        __setattr__
+
+        >>> import pickle
+        >>> state = SubtractSquareCurrentState(True, 20)
+        >>> pickle.loads(pickle.dumps(state)) == state
+        True
+        """
+        return (SubtractSquareCurrentState.intern,
+                (self.is_p1_turn, self.current_value))
+
+    @property
+    def moves(self) -> List[int]:
+        """
+        Return the squares that can be subtracted from the current value
+
+        >>> SubtractSquareCurrentState(True, 10).moves
+        [1, 4, 9]
+        """
+        return _SQUARES[:len(self._get_moves())]
+
+    def _get_moves(self) -> Tuple[str, ...]:
+        """
+        Return the possible moves, working them out on first use
+        """
+        if self._moves is None:
+            object.__setattr__(self, '_moves', tuple(
+                _SQUARE_MOVES[:_count_moves(self.current_value)]))
+        return self._moves
+
+    def _get_move_set(self) -> FrozenSet[Any]:
+        """
+        Return the possible moves as strings and as ints, working them out
+        on first use
+        """
+        if self._move_set is None:
+            moves = self._get_moves()
+            object.__setattr__(self, '_move_set', frozenset(
+                moves + tuple(_SQUARES[:len(moves)])))
+        return self._move_set
 
     def __str__(self) -> str:
         """
@@ -55,6 +145,33 @@ class SubtractSquareCurrentState(CurrentState):
         """
         return f'The current value of the game is: {self.current_value}'
 
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return true if self and other have the same turn and current value
+
+        >>> state = SubtractSquareCurrentState(True, 20)
+        >>> state == SubtractSquareCurrentState(True, 20)
+        True
+
+        >>> state = SubtractSquareCurrentState(True, 20)
+        >>> state == SubtractSquareCurrentState(False, 20)
+        False
+        """
+        return self is other or (
+            type(other) is SubtractSquareCurrentState and
+            self.current_value == other.current_value and
+            self.is_p1_turn == other.is_p1_turn)
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of self consistent with __eq__
+
+        >>> state = SubtractSquareCurrentState(True, 20)
+        >>> hash(state) == hash(SubtractSquareCurrentState(True, 20))
+        True
+        """
+        return hash((self.is_p1_turn, self.current_value))
+
     def get_possible_moves(self) -> List[str]:
         """
         Return a list of possible moves
@@ -69,13 +186,20 @@ class SubtractSquareCurrentState(CurrentState):
         >>> SubtractSquareCurrentState(False, 0).get_possible_moves()
         []
         """
-        moves_2 = []
-        move = sorted(self.moves)
-        for x in move:
-            moves_2.append(str(x))
-        return moves_2
+        return list(self._get_moves())
+
+    def is_over(self) -> bool:
+        """
+        Return True if no move can be made from self
+
+        >>> SubtractSquareCurrentState(True, 0).is_over()
+        True
+        >>> SubtractSquareCurrentState(True, 3).is_over()
+        False
+        """
+        return self.current_value == 0
 
-    def make_move(self, move_to_make: str) -> CurrentState:
+    def make_move(self, move_to_make: Any) -> CurrentState:
         """
         Apply the selected move and return a new
         CurrentState object including
@@ -83,9 +207,33 @@ class SubtractSquareCurrentState(CurrentState):
         Because this requires input, examples not available.
         Please unit test this.
         """
-        move_to_make = int(move_to_make)
-        # make sure the player is changed properly so that it alternates
-        new_value = self.current_value - move_to_make
+        return self.make_move_code(int(move_to_make))
+
+    def get_move_codes(self) -> List[int]:
+        """
+        Return the squares that can be subtracted, which are their own
+        codes
+
+        >>> SubtractSquareCurrentState(True, 20).get_move_codes()
+        [1, 4, 9, 16]
+        """
+        return _SQUARES[:_count_moves(self.current_value)]
+
+    def make_move_code(self, code: int) -> CurrentState:
+        """
+        Return the state reached by subtracting the square code
+
+        >>> SubtractSquareCurrentState(
+        ...     True, 20).make_move_code(16).current_value
+        4
+        >>> SubtractSquareCurrentState(True, 3).make_move_code(4)
+        Traceback (most recent call last):
+        ...
+        ValueError: 4 is not a possible move
+        """
+        if not 0 < code <= self.current_value or isqrt(code) ** 2 != code:
+            raise ValueError(f'{code!r} is not a possible move')
+        new_value = self.current_value - code
 
         # if the new value is 0 i.e the game is over,
         # do not change players in the new state
@@ -94,19 +242,45 @@ class SubtractSquareCurrentState(CurrentState):
         # that the new state returned is the winning state
         # i.e 0 and the winning player
         if new_value == 0:
-            if self.get_current_player_name() == "p1":
-                new_state = SubtractSquareCurrentState(True, new_value)
-            else:
-                new_state = SubtractSquareCurrentState(False, new_value)
+            return SubtractSquareCurrentState.intern(self.is_p1_turn,
+                                                     new_value)
 
         # if new value > 0 i.e game is not over, switch players in the new state
+        return SubtractSquareCurrentState.intern(not self.is_p1_turn,
+                                                 new_value)
 
-        elif self.get_current_player_name() == "p1":
-            new_state = SubtractSquareCurrentState(False, new_value)
-        else:
-            new_state = SubtractSquareCurrentState(True, new_value)
+    def sample_move_code(self, rng: Random) -> int:
+        """
+        Return a square no greater than the current value picked uniformly
+        at random with rng, as the square of a root drawn from
+        1..isqrt(current_value)
 
-        return new_state
+        >>> SubtractSquareCurrentState(True, 3).sample_move_code(Random(0))
+        1
+        >>> state = SubtractSquareCurrentState(True, 20)
+        >>> state.sample_move(Random(0)) in state.get_possible_moves()
+        True
+        """
+        root = rng.randint(1, isqrt(self.current_value))
+        return root * root
+
+    def move_to_code(self, move: Any) -> int:
+        """
+        Return the square move as an int
+
+        >>> SubtractSquareCurrentState(True, 20).move_to_code('9')
+        9
+        """
+        return int(move)
+
+    def code_to_move(self, code: int) -> str:
+        """
+        Return the square code as a move string
+
+        >>> SubtractSquareCurrentState(True, 20).code_to_move(9)
+        '9'
+        """
+        return str(code)
 
     def is_valid_move(self, move: Any) -> bool:
         """
@@ -120,9 +294,21 @@ class SubtractSquareCurrentState(CurrentState):
 
         >>> SubtractSquareCurrentState(True, 25).is_valid_move(25)
         True
+
+        >>> SubtractSquareCurrentState(True, 25).is_valid_move([4])
+        False
+
+        >>> SubtractSquareCurrentState(True, 25).is_valid_move(True)
+        False
         """
-        str_move = str(move)
-        return str_move in self.get_possible_moves()
+        # True equals the square 1 as an int, but is no move
+        if isinstance(move, bool):
+            return False
+        try:
+            return move in self._get_move_set()
+        except TypeError:
+            # an unhashable move cannot be in the set of possible moves
+            return False
 
     if __name__ == "__main__":
         import python_ta
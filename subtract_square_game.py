@@ -2,6 +2,7 @@
 
 """
 
+from typing import Optional
 from game import Game
 from subtract_square_current_state import SubtractSquareCurrentState
 
@@ -18,17 +19,27 @@ class SubtractSquareGame(Game):
     current_state: SubtractSquareCurrentState
     INSTRUCTIONS_SAMPLE = "How to play Subtract Square"
 
-    def __init__(self, is_p1_turn: bool) -> None:
+    def __init__(self, is_p1_turn: bool,
+                 current_value: Optional[int] = None) -> None:
         """
-        This initializer extends the initilizer of the Game class
+        This initializer extends the initilizer of the Game class.
+        The starting value is asked for unless current_value is given.
+
+        >>> print(SubtractSquareGame(True, 20).current_state)
+        The current value of the game is: 20
         """
         Game.__init__(self, is_p1_turn)
-        self.current_value = input("Please select a starting value:")
+        if current_value is not None:
+            if current_value < 0:
+                raise ValueError("No Negative Numbers!")
+            self.current_value = str(current_value)
+        else:
+            self.current_value = input("Please select a starting value:")
         while int(self.current_value) < 0:
             self.current_value = input("No Negative Numbers!"
                                        "Please select another value")
-        self.current_state = (SubtractSquareCurrentState
-                              (is_p1_turn, int(self.current_value.strip())))
+        self.current_state = SubtractSquareCurrentState.intern(
+            is_p1_turn, int(self.current_value.strip()))
 
     def __str__(self) -> str:
         """
@@ -75,15 +86,18 @@ class SubtractSquareGame(Game):
         Because this requires input, examples not available.
         Please unit test this.
         """
-        return current_state.get_possible_moves() == []
+        return current_state.is_over()
 
     def is_winner(self, player: str) -> bool:
         #  check to see if the game is over and if there are any moves available
         """
-        Return True if the game is over and player is the winner
+        Return True if the game is over and player is the winner, or if
+        player is "draw" and the game is drawn
         Because this requires input, examples not available.
         Please unit test this.
         """
+        if player.strip().lower() == "draw":
+            return self.is_draw()
         if self.is_over(self.current_state):
             return self.current_state.get_current_player_name() == player
 
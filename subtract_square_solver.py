@@ -0,0 +1,219 @@
+"""Subtract Square solver module
+
+"""
+from array import array
+from math import isqrt
+
+
+class SubtractSquareSolver:
+    """
+    Win/loss table for every Subtract Square value from 0 up to a limit
+
+    limit - the largest value the table covers
+
+    >>> solver = SubtractSquareSolver(20)
+    >>> solver.is_winning(20)
+    False
+    >>> solver.is_winning(21)
+    True
+    >>> solver.winning_move(21)
+    16
+    >>> solver.winning_move(20)
+    0
+    """
+
+    limit: int
+    _roots: array
+
+    def __init__(self, limit: int = 0) -> None:
+        """
+        Initialize a solver whose table covers the values 0 to limit
+        """
+        self.limit = -1
+        self._roots = array('I')
+        self.extend(limit)
+
+    def extend(self, limit: int) -> None:
+        """
+        Make the table cover the values 0 to limit.
+
+        The table is built bottom-up in one sweep. A value no square leads
+        from to a losing value is itself losing (a P-position), and every
+        value a square above a losing value is winning (an N-position) by
+        subtracting that square. _roots stores the root of the winning
+        square for each value, or 0 for a losing one.
+
+        >>> solver = SubtractSquareSolver(5)
+        >>> solver.extend(50)
+        >>> solver.limit
+        50
+        >>> [n for n in range(51) if not solver.is_winning(n)]
+        [0, 2, 5, 7, 10, 12, 15, 17, 20, 22, 34, 39, 44]
+        """
+        if limit <= self.limit:
+            return
+        roots = array('I', bytes(4 * (limit + 1)))
+        squares = [k * k for k in range(1, isqrt(limit) + 1)]
+        for value in range(limit + 1):
+            if roots[value]:
+                continue
+            for root, square in enumerate(squares, 1):
+                above = value + square
+                if above > limit:
+                    break
+                if not roots[above]:
+                    roots[above] = root
+        self._roots = roots
+        self.limit = limit
+
+    def _ensure(self, value: int) -> None:
+        """
+        Grow the table so that it covers value, at least doubling its size
+        so that a rising series of values is solved in few sweeps
+        """
+        if value > self.limit:
+            self.extend(max(value, 2 * self.limit))
+
+    def is_winning(self, value: int) -> bool:
+        """
+        Return True if the player to move wins from value with perfect play
+        """
+        self._ensure(value)
+        return self._roots[value] != 0
+
+    def winning_move(self, value: int) -> int:
+        """
+        Return a square whose subtraction from value leaves the opponent
+        losing, or 0 if value is a losing position
+        """
+        self._ensure(value)
+        root = self._roots[value]
+        return root * root
+
+
+class SubtractSquareBitsetSolver:
+    """
+    Table of the losing (P-) positions of Subtract Square from 0 up to a
+    limit, found with word-level bit operations on Python ints, for limits
+    too large for SubtractSquareSolver's per-value loop
+
+    limit - the largest value the table covers
+
+    >>> solver = SubtractSquareBitsetSolver(50)
+    >>> [n for n in range(51) if not solver.is_winning(n)]
+    [0, 2, 5, 7, 10, 12, 15, 17, 20, 22, 34, 39, 44]
+    >>> solver.winning_move(21)
+    16
+    >>> solver.winning_move(20)
+    0
+    """
+
+    limit: int
+    block_size: int
+    _losing: bytearray
+
+    def __init__(self, limit: int = 0, block_size: int = 1 << 15) -> None:
+        """
+        Initialize a solver whose table covers the values 0 to limit,
+        solving block_size values (a positive multiple of 8) at a time
+
+        >>> SubtractSquareBitsetSolver(100, block_size=12)
+        Traceback (most recent call last):
+        ...
+        ValueError: block_size must be a positive multiple of 8, not 12
+        """
+        if block_size <= 0 or block_size % 8 != 0:
+            raise ValueError(f"block_size must be a positive multiple of 8, "
+                             f"not {block_size}")
+        self.limit = -1
+        self.block_size = block_size
+        self._losing = bytearray()
+        self.extend(limit)
+
+    def extend(self, limit: int) -> None:
+        """
+        Make the table cover the values 0 to limit.
+
+        The values are solved a block at a time, as a bitset of the block
+        with bit i set if start + i is winning. For every square, the bits
+        of the losing values one square below the block are ORed in at
+        once, as one shifted slice of the losing bitset solved so far (the
+        still-unsolved values in it are 0). What is left are the moves
+        within the block: its lowest value not yet winning is losing, and
+        every value a square above it is winning, again by one shifted OR.
+        """
+        if limit <= self.limit:
+            return
+        block = self.block_size
+        size = (limit // block + 1) * block
+        losing = bytearray(size // 8)
+        squares = [k * k for k in range(1, isqrt(size) + 1)]
+        in_block = 0
+        for square in squares:
+            if square < block:
+                in_block |= 1 << square
+        full = (1 << block) - 1
+        view = memoryview(losing)
+
+        for start in range(0, size, block):
+            winning = 0
+            for square in squares:
+                below = start - square
+                if below <= -block:
+                    break
+                if below >= 0:
+                    winning |= int.from_bytes(
+                        view[below >> 3:(below + block + 7) >> 3],
+                        'little') >> (below & 7)
+                else:
+                    winning |= int.from_bytes(
+                        view[:(below + block + 7) >> 3], 'little') << -below
+
+            block_losing = 0
+            free = ~winning & full
+            while free:
+                lowest = free & -free
+                block_losing |= lowest
+                free &= ~(in_block << (lowest.bit_length() - 1) | lowest)
+            losing[start >> 3:(start + block) >> 3] = \
+                block_losing.to_bytes(block >> 3, 'little')
+
+        self._losing = losing
+        self.limit = limit
+
+    def _ensure(self, value: int) -> None:
+        """
+        Grow the table so that it covers value, at least doubling its size
+        """
+        if value > self.limit:
+            self.extend(max(value, 2 * self.limit))
+
+    def _is_losing(self, value: int) -> bool:
+        """
+        Return True if value is a losing position, which it must be in the
+        table
+        """
+        return self._losing[value >> 3] >> (value & 7) & 1 == 1
+
+    def is_winning(self, value: int) -> bool:
+        """
+        Return True if the player to move wins from value with perfect play
+        """
+        self._ensure(value)
+        return not self._is_losing(value)
+
+    def winning_move(self, value: int) -> int:
+        """
+        Return the largest square whose subtraction from value leaves the
+        opponent losing, or 0 if value is a losing position
+        """
+        self._ensure(value)
+        for root in range(isqrt(value), 0, -1):
+            if self._is_losing(value - root * root):
+                return root * root
+        return 0
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
@@ -264,6 +264,30 @@ class SubtractSquareUnitTests(unittest.TestCase):
                          "After calling make_move, the current_state of a " +
                          "game should not be changed.")
 
+    def test_search_state_apply_undo(self):
+        """
+        Test that apply() on a search state reaches the same positions as
+        make_move(), and that undo() puts back every position exactly.
+        """
+        from search_state import search_state
+        with patch('builtins.input', return_value=str(200)):
+            game = SubtractSquareGame(True)
+        search = search_state(game.current_state)
+        states = [game.current_state]
+        while not states[-1].is_over() and len(states) < 30:
+            code = states[-1].get_move_codes()[-1]
+            search.apply(code)
+            states.append(states[-1].make_move(
+                states[-1].code_to_move(code)))
+            self.assertEqual(states[-1], search.to_state(),
+                             "apply() should reach the position make_move() "
+                             "returns.")
+        for state in reversed(states[:-1]):
+            search.undo()
+            self.assertEqual(state, search.to_state(),
+                             "undo() should restore the position before the "
+                             "last move.")
+
     @patch('builtins.input', side_effect=['20'])
     def test_subtractsquare_is_valid_move_true(self, input):
         """
@@ -337,6 +361,47 @@ class SubtractSquareUnitTests(unittest.TestCase):
                           "Square with a value of 20) should return a move " +
                           "that is of the same type as a valid move."))
 
+    @patch('builtins.input', side_effect=['20'])
+    def test_state_copy_and_pickle(self, input):
+        """
+        Test to make sure states survive copy, deepcopy and a pickle round
+        trip, as they must to cross process boundaries.
+        """
+        import copy
+        import pickle
+        game = SubtractSquareGame(True)
+        state = game.current_state.make_move(game.str_to_move("4"))
+        for copied in (copy.copy(state), copy.deepcopy(state),
+                       pickle.loads(pickle.dumps(state))):
+            self.assertEqual(copied, state)
+            self.assertEqual(copied.is_p1_turn, state.is_p1_turn)
+            self.assertEqual(self.extract_subtract_square_value(copied), 16)
+
+    @patch('builtins.print')
+    @patch('builtins.input', side_effect=['y', '5', '2', '4', '1'])
+    def test_play_records_stats(self, input, print):
+        """
+        Test to make sure GameInterface.play records a sample for every
+        strategy call and transition, and the illegal moves retried.
+        """
+        from game_interface import GameInterface
+        from instrumentation import PlayStats
+        from strategy import interactive_strategy
+        stats = PlayStats()
+        interface = GameInterface(SubtractSquareGame, interactive_strategy,
+                                  interactive_strategy)
+        interface.play(stats)
+
+        self.assertTrue(interface.game.is_winner('p2'))
+        self.assertEqual(stats.games, 1)
+        self.assertEqual(len(stats.strategy_times['p1']), 2)
+        self.assertEqual(len(stats.strategy_times['p2']), 1)
+        self.assertEqual(stats.retries, {'p1': 1, 'p2': 0},
+                         "Player 1's illegal move 2 should be one retry.")
+        self.assertEqual(len(stats.transition_times['make_move']), 2)
+        self.assertEqual(len(stats.transition_times['is_over']), 3)
+        self.assertEqual(len(stats.transition_times['is_valid_move']), 5)
+
 if __name__ == "__main__":
     unittest.main()
 
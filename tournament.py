@@ -0,0 +1,198 @@
+"""
+Tournament module
+
+Plays round-robin matches between the strategies in usable_strategies on a
+pool of worker processes, one per CPU core by default.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import permutations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from game_interface import playable_games, usable_strategies
+from game_runner import play_games
+from mcts import MCTSStrategy
+from alphabeta import AlphaBetaStrategy
+
+# Strategies that need a person at the console, and so can't play here
+_INTERACTIVE = ('i',)
+
+
+class MatchRecord:
+    """
+    Running totals of the games played between two strategies
+
+    p1 - the key in usable_strategies of the strategy moving first
+    p2 - the key in usable_strategies of the strategy moving second
+    games - the number of games played so far
+    p1_wins - the number of those games p1 won
+    p2_wins - the number of those games p2 won
+    draws - the number of those games drawn
+    total_moves - the number of moves made over those games
+    """
+
+    p1: str
+    p2: str
+    games: int
+    p1_wins: int
+    p2_wins: int
+    draws: int
+    total_moves: int
+
+    def __init__(self, p1: str, p2: str) -> None:
+        """
+        Initialize an empty record of p1 playing p2
+        """
+        self.p1 = p1
+        self.p2 = p2
+        self.games = 0
+        self.p1_wins = 0
+        self.p2_wins = 0
+        self.draws = 0
+        self.total_moves = 0
+
+    def __str__(self) -> str:
+        """
+        Return a one-line summary of self
+
+        >>> record = MatchRecord('s', 'r')
+        >>> record.add((2, 1, 1, 10))
+        >>> print(record)
+        s vs r: 4 games, p1 won 50.0%, p2 won 25.0%, drew 25.0%, 2.5 moves/game
+        """
+        return (f'{self.p1} vs {self.p2}: {self.games} games, '
+                f'p1 won {100 * self.p1_win_rate():.1f}%, '
+                f'p2 won {100 * self.p2_win_rate():.1f}%, '
+                f'drew {100 * self.draw_rate():.1f}%, '
+                f'{self.total_moves / max(self.games, 1):.1f} moves/game')
+
+    def add(self, chunk: Tuple[int, int, int, int]) -> None:
+        """
+        Add the (p1 wins, p2 wins, draws, moves) totals of a chunk of games
+        """
+        p1_wins, p2_wins, draws, moves = chunk
+        self.games += p1_wins + p2_wins + draws
+        self.p1_wins += p1_wins
+        self.p2_wins += p2_wins
+        self.draws += draws
+        self.total_moves += moves
+
+    def p1_win_rate(self) -> float:
+        """
+        Return the fraction of the games so far won by p1
+        """
+        return self.p1_wins / max(self.games, 1)
+
+    def p2_win_rate(self) -> float:
+        """
+        Return the fraction of the games so far won by p2
+        """
+        return self.p2_wins / max(self.games, 1)
+
+    def draw_rate(self) -> float:
+        """
+        Return the fraction of the games so far drawn
+        """
+        return self.draws / max(self.games, 1)
+
+
+def _fresh(strategy: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """
+    Return strategy, or a new instance with the same settings if it keeps
+    what it searched from call to call, so that no chunk depends on the
+    chunks a worker process played before it
+    """
+    if isinstance(strategy, MCTSStrategy):
+        return MCTSStrategy(strategy.iterations, strategy.seconds,
+                            strategy.exploration, strategy.playout_limit)
+    if isinstance(strategy, AlphaBetaStrategy):
+        return AlphaBetaStrategy(strategy.seconds, strategy.max_depth)
+    return strategy
+
+
+def _is_timed(strategy: Callable[[Any], Any]) -> bool:
+    """
+    Return True if strategy stops searching at a wall-clock deadline, so
+    the moves it makes depend on how fast it runs
+
+    >>> _is_timed(usable_strategies['a']), _is_timed(usable_strategies['t'])
+    (True, False)
+    """
+    return getattr(strategy, 'seconds', None) is not None
+
+
+def _play_chunk(game_key: str, p1: str, p2: str, count: int, seed: str,
+                game_args: Dict[str, Any]) -> Tuple[int, int, int, int]:
+    """
+    Return the (p1 wins, p2 wins, draws, moves) totals of count games,
+    played in a worker process with its own generator seeded with seed and
+    fresh instances of the strategies
+    """
+    p1_wins = p2_wins = draws = moves = 0
+    for result in play_games(count, playable_games[game_key],
+                             _fresh(usable_strategies[p1]),
+                             _fresh(usable_strategies[p2]),
+                             seed=seed, **game_args):
+        if result.winner == "p1":
+            p1_wins += 1
+        elif result.winner == "p2":
+            p2_wins += 1
+        else:
+            draws += 1
+        moves += result.move_count
+    return p1_wins, p2_wins, draws, moves
+
+
+def run_tournament(game_key: str, games_per_match: int,
+                   strategy_keys: Optional[List[str]] = None,
+                   seed: int = 0, workers: Optional[int] = None,
+                   chunk_size: int = 1000,
+                   on_update: Optional[Callable[[MatchRecord], None]] = None,
+                   **game_args: Any) -> Dict[Tuple[str, str], MatchRecord]:
+    """
+    Return the records of a round robin of games_per_match games of the game
+    playable_games[game_key] between every ordered pair of strategy_keys,
+    created with game_args. By default every strategy plays that is neither
+    interactive nor bounded by wall-clock time, as timed strategies make
+    moves that depend on how fast they run and take that long every move.
+
+    The games are split into chunks of chunk_size, each played in one of
+    workers processes with fresh strategy instances and its own generator
+    seeded from seed, the match and the chunk. A tournament without timed
+    strategies is therefore reproducible whatever the number of workers.
+    Games are drawn by the default draw rules of play_games, so every chunk
+    finishes. Each chunk is added to its record as soon as it finishes, and
+    on_update, if given, is then called with that record.
+
+    >>> records = run_tournament('s', 20, ['s', 'r'], workers=2,
+    ...                          chunk_size=5, current_value=21)
+    >>> print(records[('s', 'r')])
+    s vs r: 20 games, p1 won 100.0%, p2 won 0.0%, drew 0.0%, 3.0 moves/game
+    >>> records[('r', 's')].games
+    20
+    """
+    if strategy_keys is None:
+        strategy_keys = [key for key in usable_strategies
+                         if key not in _INTERACTIVE and
+                         not _is_timed(usable_strategies[key])]
+    records = {}
+    with ProcessPoolExecutor(workers) as executor:
+        futures = {}
+        for p1, p2 in permutations(strategy_keys, 2):
+            records[(p1, p2)] = MatchRecord(p1, p2)
+            for start in range(0, games_per_match, chunk_size):
+                count = min(chunk_size, games_per_match - start)
+                chunk_seed = f'{seed}:{game_key}:{p1}:{p2}:{start}'
+                future = executor.submit(_play_chunk, game_key, p1, p2, count,
+                                         chunk_seed, game_args)
+                futures[future] = (p1, p2)
+
+        for future in as_completed(futures):
+            record = records[futures[future]]
+            record.add(future.result())
+            if on_update is not None:
+                on_update(record)
+    return records
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
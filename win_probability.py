@@ -0,0 +1,249 @@
+"""
+Win probability module
+
+Works out, as Markov chains, the exact probability of beating
+random_strategy from every position of both games, for a player who picks
+every move to make that probability as large as possible.
+
+Two probabilities are kept per position: mover, the chance the maximizing
+player wins when it is their turn, and waiting, the chance they win when
+it is random_strategy's turn. A move that ends the game keeps the turn
+with its winner, and any other move passes it, so a move keeping the turn
+leads to the same kind of probability and any other move to the other
+kind. In an over position the named player has won, so its mover
+probability is 1 and its waiting probability 0.
+
+The Chopsticks equations are solved densely with numpy.linalg.solve on
+purpose. There are only 1250 positions, so the 2500 by 2500 system takes
+well under a second, and SciPy's sparse solvers are not a dependency.
+"""
+from math import isqrt
+from typing import Any, Optional, Tuple
+import numpy as np
+from current_state import CurrentState
+from game import Game
+from subtract_square_current_state import SubtractSquareCurrentState
+from chopsticks_current_state import (ChopsticksCurrentState, _POSITIONS,
+                                      _TRANSITIONS)
+
+# The (mover, waiting) tables, built on first use; the Subtract Square
+# ones are indexed by value and grown when a larger value is asked about,
+# and the Chopsticks ones come with the move index picked in each position
+_subtract_square_tables: Optional[Tuple[np.ndarray, np.ndarray]] = None
+_chopsticks_tables: Optional[Tuple[np.ndarray, np.ndarray,
+                                   np.ndarray]] = None
+
+# The change below which value iteration has converged, and above which a
+# move is better than the one policy iteration already picks
+_TOLERANCE = 1e-12
+
+
+def subtract_square_probabilities(limit: int) -> Tuple[np.ndarray,
+                                                       np.ndarray]:
+    """
+    Return the (mover, waiting) probabilities of every value up to limit.
+
+    Subtract Square never repeats a value, so one sweep up from 0 settles
+    every value from the smaller ones it leads to: mover is the best of the
+    moves and waiting the average of them. Each value needs the one below
+    it, so the sweep goes value by value, with the moves of each value
+    vectorized.
+
+    >>> mover, waiting = subtract_square_probabilities(5)
+    >>> mover.tolist()
+    [1.0, 1.0, 0.0, 1.0, 1.0, 0.5]
+    >>> waiting.tolist()
+    [0.0, 0.0, 1.0, 0.0, 0.5, 1.0]
+    """
+    squares = np.arange(1, isqrt(limit) + 1) ** 2
+    # the probability of arriving at each value after the maximizing
+    # player's move, and after random_strategy's: reaching 0 wins for the
+    # player who moved there
+    after_mover = np.zeros(limit + 1)
+    after_waiting = np.zeros(limit + 1)
+    after_mover[0] = 1.0
+    for value in range(1, limit + 1):
+        children = value - squares[:isqrt(value)]
+        mover = after_mover[children].max()
+        after_mover[value] = after_waiting[children].mean()
+        after_waiting[value] = mover
+
+    mover, waiting = after_waiting, after_mover
+    mover[0], waiting[0] = 1.0, 0.0
+    return mover, waiting
+
+
+def chopsticks_probabilities() -> Tuple[np.ndarray, np.ndarray,
+                                        np.ndarray]:
+    """
+    Return the (mover, waiting) probabilities of every packed Chopsticks
+    position, and the index of the move the maximizing player makes in it.
+
+    Positions repeat, so they are worked out together by policy iteration:
+    the moves the maximizing player picks are fixed, the linear equations
+    they give are solved with NumPy, and the moves are re-picked from the
+    solution until none improves. Value iteration first gives moves close
+    to the best. Positions from which the picked moves never end the game
+    win with probability 0. Other moves may tie with the picked ones, but
+    only the picked ones are sure to reach those probabilities, since
+    following tied moves can go round a cycle for ever.
+
+    >>> mover, waiting, moves = chopsticks_probabilities()
+    >>> start = ChopsticksCurrentState(True)._code
+    >>> float(mover[start]), round(float(waiting[start]), 4)
+    (1.0, 0.9583)
+    """
+    transitions = np.array(_TRANSITIONS).reshape(_POSITIONS, 4)
+    legal = transitions >= 0
+    children = np.where(legal, transitions, 0)
+    codes = np.arange(_POSITIONS)[:, None]
+    keeps_turn = (children & 1) == (codes & 1)
+    # indexes into the vector of mover probabilities followed by waiting
+    # ones, of each move made by the maximizing player and by random play
+    by_mover = np.where(keeps_turn, children, _POSITIONS + children)
+    by_waiting = np.where(keeps_turn, _POSITIONS + children, children)
+    over = ~legal.any(axis=1)
+    playing = np.flatnonzero(~over)
+    move_counts = legal.sum(axis=1)
+
+    probabilities = np.zeros(2 * _POSITIONS)
+    probabilities[:_POSITIONS][over] = 1.0
+    while True:
+        mover = np.where(legal, probabilities[by_mover], -1.0).max(axis=1)
+        waiting = (np.where(legal, probabilities[by_waiting], 0.0)
+                   .sum(axis=1) / np.maximum(move_counts, 1))
+        updated = np.concatenate([np.where(over, 1.0, mover),
+                                  np.where(over, 0.0, waiting)])
+        if np.abs(updated - probabilities).max() < _TOLERANCE:
+            break
+        probabilities = updated
+
+    policy = np.where(legal, probabilities[by_mover], -1.0).argmax(axis=1)
+    while True:
+        probabilities = _evaluate(policy, by_mover, by_waiting, legal, over)
+        values = np.where(legal, probabilities[by_mover], -1.0)
+        best = values.argmax(axis=1)
+        current = values[np.arange(_POSITIONS), policy]
+        improves = values[np.arange(_POSITIONS), best] > current + _TOLERANCE
+        if not improves[playing].any():
+            return (probabilities[:_POSITIONS], probabilities[_POSITIONS:],
+                    policy)
+        policy = np.where(improves, best, policy)
+
+
+def _evaluate(policy: np.ndarray, by_mover: np.ndarray,
+              by_waiting: np.ndarray, legal: np.ndarray,
+              over: np.ndarray) -> np.ndarray:
+    """
+    Return the mover and waiting probabilities of every Chopsticks position
+    when the maximizing player always makes the move policy picks, by
+    solving the linear equations of the Markov chain that gives, densely
+    as there are only 2 * _POSITIONS of them
+    """
+    size = 2 * _POSITIONS
+    # every transition of the chain, from and to indexes into the
+    # probabilities, with its probability: the picked move from mover
+    # rows, and every legal move equally from waiting rows
+    playing = np.flatnonzero(~over)
+    moved, picked = np.nonzero(legal[playing])
+    moved = playing[moved]
+    sources = np.concatenate([playing, _POSITIONS + moved])
+    targets = np.concatenate([by_mover[playing, policy[playing]],
+                              by_waiting[moved, picked]])
+    weights = np.concatenate([np.ones(len(playing)),
+                              1.0 / legal[moved].sum(axis=1)])
+
+    # only positions from which an over position can be reached have
+    # equations; the rest never end and so are never won
+    ends = np.concatenate([over, over])
+    while True:
+        reached = ends.copy()
+        reached[sources[ends[targets]]] = True
+        if (reached == ends).all():
+            break
+        ends = reached
+    kept = ends[sources]
+
+    matrix = np.eye(size)
+    np.add.at(matrix, (sources[kept], targets[kept]), -weights[kept])
+    constants = np.zeros(size)
+    constants[:_POSITIONS][over] = 1.0
+    return np.linalg.solve(matrix, constants)
+
+
+def _tables(state: CurrentState) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the (mover, waiting) tables covering state, building or growing
+    them first if needed
+    """
+    global _subtract_square_tables, _chopsticks_tables
+    if isinstance(state, ChopsticksCurrentState):
+        if _chopsticks_tables is None:
+            _chopsticks_tables = chopsticks_probabilities()
+        return _chopsticks_tables[0], _chopsticks_tables[1]
+    if isinstance(state, SubtractSquareCurrentState):
+        if _subtract_square_tables is None or \
+                len(_subtract_square_tables[0]) <= state.current_value:
+            size = 1024
+            if _subtract_square_tables is not None:
+                size = 2 * len(_subtract_square_tables[0])
+            _subtract_square_tables = subtract_square_probabilities(
+                max(size, state.current_value))
+        return _subtract_square_tables
+    raise TypeError(f'no win probabilities for {type(state).__name__}')
+
+
+def _index(state: CurrentState) -> int:
+    """
+    Return the index of state in its tables
+    """
+    if isinstance(state, ChopsticksCurrentState):
+        return state._code
+    return state.current_value
+
+
+def win_probability(state: CurrentState, player: Optional[str] = None) \
+        -> float:
+    """
+    Return the probability that player ("p1" or "p2"; by default the player
+    whose turn it is in state) wins from state against random_strategy,
+    picking every move to make that probability as large as possible
+
+    >>> win_probability(SubtractSquareCurrentState(True, 5))
+    0.5
+    >>> win_probability(SubtractSquareCurrentState(True, 5), "p2")
+    1.0
+    >>> win_probability(SubtractSquareCurrentState(False, 0), "p1")
+    0.0
+    """
+    mover, waiting = _tables(state)
+    if player is None or player == state.get_current_player_name():
+        return float(mover[_index(state)])
+    return float(waiting[_index(state)])
+
+
+def win_probability_strategy(game: Game) -> Any:
+    """
+    Return a move for game that gives the current player the greatest
+    probability of beating random_strategy. In Chopsticks this is the move
+    picked by chopsticks_probabilities, so that ties never cycle.
+
+    >>> from subtract_square_game import SubtractSquareGame
+    >>> win_probability_strategy(SubtractSquareGame(True, 5))
+    '1'
+    """
+    state = game.current_state
+    if isinstance(state, ChopsticksCurrentState):
+        _tables(state)
+        best_code = int(_chopsticks_tables[2][state._code])
+    else:
+        player = state.get_current_player_name()
+        best_code = max(state.get_move_codes(),
+                        key=lambda code: win_probability(
+                            state.make_move_code(code), player))
+    return game.str_to_move(state.code_to_move(best_code))
+
+
+if __name__ == "__main__":
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")